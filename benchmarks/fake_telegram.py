@@ -0,0 +1,65 @@
+from collections import Counter
+from typing import Any, AsyncGenerator
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message, InlineKeyboardMarkup
+import asyncio
+import datetime
+import itertools
+
+FAKE_TOKEN = "123456:ABCdefGHIjklMNOpqrSTUvwxYZ012345678"
+
+
+class FakeTelegramSession(BaseSession):
+    """Answers Bot API calls in-process so handlers run without touching Telegram."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        # Last inline keyboard sent to each chat, so scripted users can "press" its buttons
+        self.markups: dict[int, InlineKeyboardMarkup] = {}
+        self._message_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        pass
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        self.calls[type(method).__name__] += 1
+        markup = getattr(method, "reply_markup", None)
+        if isinstance(markup, InlineKeyboardMarkup):
+            self.markups[getattr(method, "chat_id", 0) or 0] = markup
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method.__returning__ is Message:
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.datetime.now(),
+                chat=Chat(id=getattr(method, "chat_id", 0) or 0, type="private"),
+                text=getattr(method, "text", None),
+            )
+        # bool and Union[Message, bool] results (answerCallbackQuery, editMessageText, ...)
+        return True
+
+    async def stream_content(self, url: str, headers: dict | None = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+
+def find_button(session: FakeTelegramSession, chat_id: int, prefix: str, suffix: str = "") -> str | None:
+    """callback_data of the first button matching `prefix`/`suffix` on the chat's last inline keyboard."""
+    markup = session.markups.get(chat_id)
+    if markup is None:
+        return None
+    for row in markup.inline_keyboard:
+        for button in row:
+            data = button.callback_data
+            if data and data.startswith(prefix) and data.endswith(suffix):
+                return data
+    return None
+
+
+def fake_bot_factory() -> Bot:
+    return Bot(token=FAKE_TOKEN, session=FakeTelegramSession())
@@ -0,0 +1,199 @@
+"""End-to-end load test of the bot's handlers.
+
+Builds the real dispatcher with every router and feeds it scripted users through
+dp.feed_raw_update. Bot API calls are answered by FakeTelegramSession, and the
+database is the one from .env, so point it at a throwaway database:
+
+    python -m benchmarks.load --employees 50 --clients 200 --concurrency 50
+
+Phases run one after another: sign-ups, then browsing/search/order creation, then
+freelancers approving, then clients completing and reviewing. Every phase reports
+throughput and SQL statements per update. At the end there is a p50/p95/p99 latency
+table per handler. Outbox messages are queued but not sent.
+"""
+from collections import defaultdict
+from typing import Any, Callable
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.fake_telegram import FakeTelegramSession, FAKE_TOKEN, find_button
+from benchmarks.updates import message_update, callback_update, client_sign_up_flow, employee_sign_up_flow
+from src.bot import metrics
+from src.bot.dispatcher import create_dispatcher
+from src.db.enums import BranchEnum
+from src.db.query_stats import current_query_stats
+from src.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+Step = dict[str, Any] | Callable[[FakeTelegramSession, int], dict[str, Any] | None]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.queries: dict[str, list[int]] = defaultdict(list)
+        self.updates = 0
+        self.errors = 0
+
+    @property
+    def update_queries(self) -> float:
+        # Counted per update by the dispatcher's own UpdateMetricsMiddleware
+        return metrics.update_db_queries.labels().sum
+
+    async def handler_middleware(self, handler, event, data):
+        # Raw samples rather than the production histograms, for exact percentiles
+        stats = current_query_stats.get()
+        before = stats.count if stats else 0
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            name = data["handler"].callback.__name__
+            self.latencies[name].append(time.perf_counter() - start)
+            self.queries[name].append((stats.count if stats else 0) - before)
+
+
+def press(prefix: str, suffix: str = "") -> Step:
+    def step(session: FakeTelegramSession, user_id: int) -> dict[str, Any] | None:
+        data = find_button(session, user_id, prefix, suffix)
+        return callback_update(user_id, data) if data else None
+    return step
+
+
+def browse_and_order(user_id: int, branch: str, pages: int) -> list[Step]:
+    return [
+        message_update(user_id, "🔍 Find freelancer"),
+        callback_update(user_id, f"branch:{branch}"),
+        *[press(f"emp_page:{branch}:n:") for _ in range(pages)],
+        press("emp_profile:"),
+        press("emp_select:"),
+        message_update(user_id, "Benchmark task"),
+        message_update(user_id, "100"),
+        callback_update(user_id, "order_confirm"),
+        message_update(user_id, "🔎 Search"),
+        message_update(user_id, "python"),
+        message_update(user_id, "👤 Profile"),
+    ]
+
+
+def approve_orders(user_id: int, orders: int) -> list[Step]:
+    steps: list[Step] = []
+    for _ in range(orders):
+        steps += [message_update(user_id, "📋 My orders"), press("emp_order_view:"), press("order_approve:")]
+    return steps + [message_update(user_id, "📊 Statistics"), message_update(user_id, "👤 Profile")]
+
+
+def complete_and_review(user_id: int) -> list[Step]:
+    return [
+        message_update(user_id, "📋 My orders"),
+        press("client_orders:active"),
+        press("client_order_view:"),
+        press("order_complete:"),
+        press("rating:", ":5"),
+        message_update(user_id, "Great work"),
+    ]
+
+
+async def run_user(dp: Dispatcher, bot: Bot, recorder: Recorder, user_id: int, steps: list[Step]) -> None:
+    for step in steps:
+        raw = step(bot.session, user_id) if callable(step) else step
+        if raw is None:
+            # The button this user would press isn't there (nothing left to approve, etc.)
+            continue
+        try:
+            result = await dp.feed_raw_update(bot, raw)
+            if isinstance(result, TelegramMethod):
+                await dp.silent_call_request(bot, result)
+        except Exception:
+            # The rest of this user's script depends on the failed step
+            if not recorder.errors:
+                logger.exception("Update %s failed", raw["update_id"])
+            recorder.errors += 1
+            return
+        finally:
+            recorder.updates += 1
+
+
+async def run_phase(name: str, dp: Dispatcher, bot: Bot, recorder: Recorder, scripts: dict[int, list[Step]], concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(user_id: int, steps: list[Step]) -> None:
+        async with semaphore:
+            await run_user(dp, bot, recorder, user_id, steps)
+
+    updates, queries, errors = recorder.updates, recorder.update_queries, recorder.errors
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(user_id, steps) for user_id, steps in scripts.items()))
+    elapsed = time.perf_counter() - start
+    updates, queries, errors = recorder.updates - updates, recorder.update_queries - queries, recorder.errors - errors
+    print(
+        f"{name:<18} {updates:7d} updates {elapsed:8.2f}s {updates / elapsed:9.1f} upd/s "
+        f"{queries / max(updates, 1):6.2f} queries/upd {errors:5d} errors"
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def report(recorder: Recorder) -> None:
+    print(f"\n{'handler':<28} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for name, latencies in sorted(recorder.latencies.items(), key=lambda item: -percentile(item[1], 0.95)):
+        queries = recorder.queries[name]
+        print(
+            f"{name:<28} {len(latencies):7d} "
+            f"{percentile(latencies, 0.5) * 1000:8.2f} {percentile(latencies, 0.95) * 1000:8.2f} "
+            f"{percentile(latencies, 0.99) * 1000:8.2f} {sum(queries) / len(queries):8.2f}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    recorder = Recorder()
+
+    bot = Bot(token=FAKE_TOKEN, session=FakeTelegramSession(latency=args.latency))
+    dp = create_dispatcher()
+    dp.message.middleware(recorder.handler_middleware)
+    dp.callback_query.middleware(recorder.handler_middleware)
+
+    # Fresh ids every run so the role cache and FSM state start cold
+    offset = args.user_offset or int(time.time() * 1000)
+    branches = [branch.value for branch in BranchEnum]
+    employees = [offset + i for i in range(args.employees)]
+    clients = [offset + args.employees + i for i in range(args.clients)]
+    orders_per_employee = -(-args.clients // max(args.employees, 1))
+
+    await run_phase("sign up", dp, bot, recorder, {
+        **{user_id: employee_sign_up_flow(user_id, branches[i % len(branches)]) for i, user_id in enumerate(employees)},
+        **{user_id: client_sign_up_flow(user_id) for user_id in clients},
+    }, args.concurrency)
+    await run_phase("browse + order", dp, bot, recorder, {
+        user_id: browse_and_order(user_id, branches[i % len(branches)], args.pages) for i, user_id in enumerate(clients)
+    }, args.concurrency)
+    await run_phase("approve", dp, bot, recorder, {
+        user_id: approve_orders(user_id, orders_per_employee) for user_id in employees
+    }, args.concurrency)
+    await run_phase("complete + review", dp, bot, recorder, {
+        user_id: complete_and_review(user_id) for user_id in clients
+    }, args.concurrency)
+
+    if recorder.latencies:
+        report(recorder)
+    print(f"\nBot API calls: {dict(bot.session.calls)}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2, help="list pages each client flips through")
+    parser.add_argument("--concurrency", type=int, default=50, help="users active at the same time")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated Bot API round-trip, seconds")
+    parser.add_argument("--user-offset", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""Throughput of sharded update processing for 1..N worker processes.
+
+Runs the real dispatcher in every worker against the database from .env, with Bot API
+calls answered by FakeTelegramSession:
+
+    python -m benchmarks.sharding --workers 1 2 4 --users 500
+"""
+import argparse
+import multiprocessing
+import time
+
+from benchmarks.fake_telegram import fake_bot_factory
+from benchmarks.updates import message_update, sign_up_flow
+from src.bot.sharding import ShardedWorkers
+
+
+def run(workers: int, users: int, user_offset: int) -> float:
+    ack_queue = multiprocessing.get_context("spawn").Queue()
+    pool = ShardedWorkers(workers, bot_factory=fake_bot_factory, ack_queue=ack_queue)
+    pool.start()
+    try:
+        # Warm up every worker (imports, DB connections) outside the measured window
+        warmup = [message_update(user_offset - i - 1, "/start") for i in range(workers * 4)]
+        for update in warmup:
+            pool.submit(update)
+        for _ in warmup:
+            ack_queue.get()
+
+        updates = [update for user in range(users) for update in sign_up_flow(user_offset + user)]
+        start = time.perf_counter()
+        for update in updates:
+            pool.submit(update)
+        for _ in updates:
+            ack_queue.get()
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.stop()
+    return len(updates) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    baseline = None
+    for index, workers in enumerate(args.workers):
+        # Fresh user ids per run so role caches and FSM state start cold every time
+        throughput = run(workers, args.users, user_offset=10_000_000 * (index + 1))
+        baseline = baseline or throughput
+        print(f"workers={workers:<3} {throughput:10.1f} updates/s  x{throughput / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from typing import Any
+import itertools
+import time
+
+_update_ids = itertools.count(1)
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+
+
+def message_update(user_id: int, text: str) -> dict[str, Any]:
+    update_id = next(_update_ids)
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": _user(user_id),
+            "text": text,
+        },
+    }
+
+
+def callback_update(user_id: int, data: str) -> dict[str, Any]:
+    update_id = next(_update_ids)
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": 123456, "is_bot": True, "first_name": "Bot"},
+                "text": "...",
+            },
+        },
+    }
+
+
+def sign_up_flow(user_id: int) -> list[dict[str, Any]]:
+    return [
+        message_update(user_id, "/start"),
+        message_update(user_id, "I am a client 👨🏻‍💼"),
+        message_update(user_id, "First"),
+        message_update(user_id, "Last"),
+    ]
+
+
+def client_sign_up_flow(user_id: int) -> list[dict[str, Any]]:
+    return [
+        message_update(user_id, "/start"),
+        message_update(user_id, "I am a client 👨🏻‍💼"),
+        message_update(user_id, "First"),
+        message_update(user_id, "Last"),
+        message_update(user_id, "+71234567890"),
+        message_update(user_id, "1990-01-01"),
+        callback_update(user_id, "confirm_yes"),
+    ]
+
+
+def employee_sign_up_flow(user_id: int, branch: str, skills: str = "python, sql") -> list[dict[str, Any]]:
+    return [
+        message_update(user_id, "/start"),
+        message_update(user_id, "I am a freelancer 👨🏻‍💻"),
+        message_update(user_id, "First"),
+        message_update(user_id, "Last"),
+        message_update(user_id, "+71234567890"),
+        message_update(user_id, "1990-01-01"),
+        callback_update(user_id, f"branch:{branch}"),
+        message_update(user_id, skills),
+        callback_update(user_id, "confirm_yes"),
+    ]
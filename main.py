@@ -1,28 +1,50 @@
-from aiogram import Bot, Dispatcher
-from dotenv import load_dotenv, find_dotenv
+from aiogram import Bot
 import asyncio
-import os
 
-from src.bot.handlres.user.clients.clients_sign_in import client_sign_in_router
-from src.bot.handlres.user.employee.employee_sign_in import employee_sign_in_router
-from src.bot.handlres.user.employee.employee_handlers import employee_handlers_router
-from src.bot.handlres.user.clients.client_handlers import client_handlers_router
-from src.bot.handlres.user_handlres import user_router
+from src.bot.config import bot_settings
+from src.bot.dispatcher import create_dispatcher, used_update_types
+from src.bot.webhook import run_webhook
+from src.bot.sharding import run_sharded_polling
+from src.bot.outbox import OutboxSender
+from src.bot.metrics import start_metrics_server, register_default_gauges
+from src.db.archive import OrderArchiver
+from src.db.session import Local_Session
 
-load_dotenv(find_dotenv())
 
-bot = Bot(token=(os.getenv("BOT_TOKEN")))
-dp = Dispatcher()
+async def main():
+    # Built here rather than at import: spawned worker processes re-import this module
+    bot = Bot(token=bot_settings.BOT_TOKEN)
+    sharded = bot_settings.RUN_MODE != "webhook" and bot_settings.WORKERS > 1
+    # A sharded supervisor only polls; every worker builds its own dispatcher
+    dp = None if sharded else create_dispatcher()
+    # Lives in this process only, so sharded workers share one rate budget for notifications
+    sender = asyncio.create_task(OutboxSender(bot, Local_Session).run())
+    archiver = asyncio.create_task(OrderArchiver(Local_Session).run())
+    metrics_runner = None
+    if bot_settings.METRICS_PORT:
+        register_default_gauges(dp.storage if dp else None)
+        metrics_runner = await start_metrics_server(bot_settings.METRICS_HOST, bot_settings.METRICS_PORT)
+
+    try:
+        if sharded:
+            await run_sharded_polling(bot, used_update_types(), bot_settings.WORKERS)
+            return
 
+        if bot_settings.RUN_MODE == "webhook":
+            await run_webhook(dp, bot)
+            return
 
-async def main():
-    dp.include_routers(user_router, employee_sign_in_router, employee_handlers_router, client_sign_in_router, client_handlers_router)
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+        await bot.delete_webhook(drop_pending_updates=True)
+        await dp.start_polling(bot)
+    finally:
+        sender.cancel()
+        archiver.cancel()
+        if metrics_runner:
+            await metrics_runner.cleanup()
 
 
 if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("Bot Stoped!")
\ No newline at end of file
+        print("Bot Stoped!")
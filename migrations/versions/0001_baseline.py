@@ -0,0 +1,92 @@
+"""Baseline: schema as originally created by create_database.py
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+branch_enum = sa.Enum("IT", "VIDEO_EDITING", "TRAINER", "TEACHER", "DESIGN", name="branchenum")
+order_status_enum = sa.Enum("PENDING", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="orderstatusenum")
+
+utc_now = sa.text("TIMEZONE('utc', now())")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("telegram_user_id", sa.BigInteger(), nullable=False, unique=True),
+        sa.Column("first_name", sa.String(100), nullable=False),
+        sa.Column("last_name", sa.String(100), nullable=False),
+        sa.Column("phone", sa.String(30), nullable=False),
+        sa.Column("birth_date", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+    )
+    op.create_index("idx_clients_telegram_user_id", "clients", ["telegram_user_id"])
+
+    op.create_table(
+        "employee",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("telegram_user_id", sa.BigInteger(), nullable=False, unique=True),
+        sa.Column("first_name", sa.String(100), nullable=False),
+        sa.Column("last_name", sa.String(100), nullable=False),
+        sa.Column("phone", sa.String(30), nullable=False),
+        sa.Column("birth_date", sa.Date(), nullable=False),
+        sa.Column("branch", branch_enum, nullable=False),
+        sa.Column("rating", sa.DECIMAL(3, 2), nullable=False),
+        sa.Column("total_reviews", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+    )
+    op.create_index("idx_employee_telegram_user_id", "employee", ["telegram_user_id"])
+    op.create_index("idx_employee_branch", "employee", ["branch"])
+    op.create_index("idx_employee_rating", "employee", ["rating"])
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("client_id", sa.Integer(), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employee.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("description", sa.TEXT(), nullable=False),
+        sa.Column("price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("status", order_status_enum, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+        sa.Column("finished_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index("idx_client_id", "orders", ["client_id"])
+    op.create_index("idx_employee_id", "orders", ["employee_id"])
+    op.create_index("idx_status", "orders", ["status"])
+    op.create_index("idx_created_at", "orders", ["created_at"])
+
+    op.create_table(
+        "reviews",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("client_id", sa.Integer(), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employee.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("rating", sa.SMALLINT(), nullable=False),
+        sa.Column("comment", sa.TEXT(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+        sa.CheckConstraint("rating BETWEEN 1 AND 5", name="chk_review_rating"),
+    )
+    op.create_index("ix_reviews_employee_id", "reviews", ["employee_id"])
+    op.create_index("ix_reviews_order_id", "reviews", ["order_id"])
+    op.create_index("ix_reviews_rating", "reviews", ["rating"])
+
+
+def downgrade() -> None:
+    op.drop_table("reviews")
+    op.drop_table("orders")
+    op.drop_table("employee")
+    op.drop_table("clients")
+    order_status_enum.drop(op.get_bind(), checkfirst=True)
+    branch_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,92 @@
+"""Columns and tables added since the baseline: rating_sum, skills/search_text, open orders, fsm_states, outbox
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Everything here is catalog-only or touches new tables, except search_text: a stored generated
+column rewrites `employee`. That table is small (one row per freelancer), so the lock is brief.
+lock_timeout makes the revision fail fast instead of queueing writes behind a long transaction.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+branch_enum = postgresql.ENUM("IT", "VIDEO_EDITING", "TRAINER", "TEACHER", "DESIGN", name="branchenum", create_type=False)
+outbox_status_enum = sa.Enum("PENDING", "SENT", "FAILED", "CANCELLED", name="outboxstatusenum")
+
+utc_now = sa.text("TIMEZONE('utc', now())")
+
+
+def upgrade() -> None:
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Constant default: no rewrite since Postgres 11; real sums are backfilled in 0004
+    op.add_column("employee", sa.Column("rating_sum", sa.Integer(), nullable=False, server_default=sa.text("0")))
+    op.add_column("employee", sa.Column("skills", sa.TEXT(), nullable=True))
+    op.add_column(
+        "employee",
+        sa.Column(
+            "search_text",
+            sa.TEXT(),
+            sa.Computed("lower(first_name || ' ' || last_name || ' ' || coalesce(skills, ''))", persisted=True),
+            nullable=False,
+        ),
+    )
+
+    op.alter_column("orders", "employee_id", existing_type=sa.Integer(), nullable=True)
+    op.add_column("orders", sa.Column("branch", branch_enum, nullable=True))
+
+    op.create_table(
+        "fsm_states",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("state", sa.String(255), nullable=True),
+        sa.Column("data", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+    )
+
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("body", sa.TEXT(), nullable=False),
+        sa.Column("parse_mode", sa.String(16), nullable=True),
+        sa.Column("reply_markup", postgresql.JSONB(), nullable=True),
+        sa.Column("order_id", sa.Integer(), nullable=True),
+        sa.Column("status", outbox_status_enum, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+        sa.Column("last_error", sa.TEXT(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+        sa.Column("sent_at", sa.TIMESTAMP(), nullable=True),
+    )
+    # New, empty table: plain CREATE INDEX is fine
+    op.create_index(
+        "idx_outbox_pending_next_attempt", "outbox", ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "idx_outbox_pending_order_id", "outbox", ["order_id"],
+        postgresql_where=sa.text("status = 'PENDING' AND order_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("outbox")
+    outbox_status_enum.drop(op.get_bind(), checkfirst=True)
+    op.drop_table("fsm_states")
+    op.drop_column("orders", "branch")
+    # Fails while open orders without a freelancer exist, which is the point
+    op.alter_column("orders", "employee_id", existing_type=sa.Integer(), nullable=False)
+    op.drop_column("employee", "search_text")
+    op.drop_column("employee", "skills")
+    op.drop_column("employee", "rating_sum")
@@ -0,0 +1,65 @@
+"""Composite keyset/search indexes, built without blocking writes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+CREATE/DROP INDEX CONCURRENTLY can't run inside a transaction, so everything runs in an
+autocommit block. IF [NOT] EXISTS makes the revision safe to re-run after a failed build; a
+build that failed halfway leaves an INVALID index, which is dropped before building it again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_INDEXES = {
+    "idx_employee_branch_rating_id": "employee (branch, rating DESC, id)",
+    "idx_employee_search_trgm": "employee USING gin (search_text gin_trgm_ops)",
+    "ix_reviews_employee_created_id": "reviews (employee_id, created_at DESC, id DESC)",
+    "idx_orders_client_status_created": "orders (client_id, status, created_at DESC)",
+    "idx_orders_employee_status_created": "orders (employee_id, status, created_at DESC)",
+}
+
+# Each one is a prefix of a new composite index above
+REPLACED_INDEXES = {
+    "idx_employee_branch": "employee (branch)",
+    "ix_reviews_employee_id": "reviews (employee_id)",
+    "idx_client_id": "orders (client_id)",
+    "idx_employee_id": "orders (employee_id)",
+}
+
+
+def _drop_invalid(name: str) -> None:
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                       WHERE c.relname = '{name}' AND NOT i.indisvalid) THEN
+                EXECUTE 'DROP INDEX {name}';
+            END IF;
+        END $$
+    """)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in NEW_INDEXES.items():
+            _drop_invalid(name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        for name in REPLACED_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in REPLACED_INDEXES.items():
+            _drop_invalid(name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        for name in NEW_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,70 @@
+"""Backfill employee.rating_sum from reviews in batches
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Each batch of employees is its own short transaction, so row locks are held briefly and
+concurrent review writes (which update rating_sum atomically) only wait for one batch.
+The batch's rows are locked before the sums are taken: a review committed in between
+would otherwise be missing from a sum computed on the UPDATE's start snapshot, and the
+UPDATE would overwrite its increment. Rows already right are skipped, so the revision
+can be re-run.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+LOCK_BATCH = sa.text("SELECT id FROM employee WHERE id > :after AND id <= :until FOR UPDATE")
+
+BACKFILL = sa.text("""
+    UPDATE employee e
+    SET rating_sum = totals.rating_sum
+    FROM (
+        SELECT e2.id, coalesce(sum(r.rating), 0) AS rating_sum
+        FROM employee e2
+        LEFT JOIN reviews r ON r.employee_id = e2.id
+        WHERE e2.id > :after AND e2.id <= :until
+        GROUP BY e2.id
+    ) AS totals
+    WHERE e.id = totals.id AND e.rating_sum IS DISTINCT FROM totals.rating_sum
+""")
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        # No connection to find the id range with: one batch covering every employee
+        everyone = {"after": 0, "until": 2**31 - 1}
+        op.execute(LOCK_BATCH.bindparams(**everyone))
+        op.execute(BACKFILL.bindparams(**everyone))
+        return
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        max_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM employee")).scalar_one()
+        for after in range(0, max_id, BATCH_SIZE):
+            batch = {"after": after, "until": after + BATCH_SIZE}
+            # The connection is in autocommit here, so the batch's transaction is opened by hand
+            bind.exec_driver_sql("BEGIN")
+            try:
+                bind.execute(LOCK_BATCH, batch)
+                # A new statement, so a new snapshot: it sees every review committed before the lock
+                bind.execute(BACKFILL, batch)
+            except BaseException:
+                bind.exec_driver_sql("ROLLBACK")
+                raise
+            bind.exec_driver_sql("COMMIT")
+
+
+def downgrade() -> None:
+    # rating_sum is dropped by 0002's downgrade; nothing to undo here
+    pass
@@ -0,0 +1,157 @@
+"""Partition orders by month on created_at; add orders_archive
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+No rows are copied: the existing table is renamed to orders_legacy and attached as the
+partition for everything before BOUNDARY. Its range CHECK is validated beforehand without
+blocking writes, so ATTACH doesn't scan it, and its indexes (including the (id, created_at)
+primary key, built concurrently) are adopted by the new parent instead of rebuilt.
+The exclusive locks are held only for catalog changes.
+
+BOUNDARY is the first of the month after next, so orders created while this runs still
+satisfy the CHECK. Monthly partitions start there; src/db/archive.py creates later ones,
+and drops orders_legacy once every order in it has been archived.
+
+reviews.order_id loses its FK: a foreign key into a partitioned table has to include the
+partition key, and reviews outlive the order's move to orders_archive anyway.
+"""
+from typing import Sequence, Union
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+branch_enum = postgresql.ENUM(name="branchenum", create_type=False)
+order_status_enum = postgresql.ENUM(name="orderstatusenum", create_type=False)
+
+utc_now = sa.text("TIMEZONE('utc', now())")
+
+# Index names are schema-wide, so the legacy table's give theirs up to the new parent
+LEGACY_INDEXES = {
+    "orders_pkey": "orders_legacy_pkey",
+    "idx_orders_client_status_created": "orders_legacy_client_status_created",
+    "idx_orders_employee_status_created": "orders_legacy_employee_status_created",
+    "idx_status": "orders_legacy_status",
+    "idx_created_at": "orders_legacy_created_at",
+}
+
+
+def _add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+BOUNDARY = _add_months(datetime.datetime.now(datetime.timezone.utc).date().replace(day=1), 2)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Leftovers of an interrupted run: an INVALID index from a failed build, a CHECK for another BOUNDARY
+        op.execute("""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                           WHERE c.relname = 'orders_id_created_at_key' AND NOT i.indisvalid) THEN
+                    EXECUTE 'DROP INDEX orders_id_created_at_key';
+                END IF;
+            END $$
+        """)
+        op.execute("ALTER TABLE orders DROP CONSTRAINT IF EXISTS orders_legacy_range")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS orders_id_created_at_key ON orders (id, created_at)")
+        op.execute(f"ALTER TABLE orders ADD CONSTRAINT orders_legacy_range CHECK (created_at < '{BOUNDARY}') NOT VALID")
+        # Only takes SHARE UPDATE EXCLUSIVE, so inserts carry on during the scan
+        op.execute("ALTER TABLE orders VALIDATE CONSTRAINT orders_legacy_range")
+
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("ALTER TABLE reviews DROP CONSTRAINT IF EXISTS reviews_order_id_fkey")
+    # A partition can't keep a primary key of its own, so (id, created_at) takes over from (id)
+    # for the parent's to adopt; the index is already built, so this is catalog-only
+    op.execute("""
+        ALTER TABLE orders
+            DROP CONSTRAINT orders_pkey,
+            ADD CONSTRAINT orders_pkey PRIMARY KEY USING INDEX orders_id_created_at_key
+    """)
+    op.rename_table("orders", "orders_legacy")
+    for old, new in LEGACY_INDEXES.items():
+        op.execute(f"ALTER INDEX {old} RENAME TO {new}")
+
+    # Same column order as the legacy table, so rows routed to it need no conversion
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), nullable=False, server_default=sa.text("nextval('orders_id_seq')")),
+        sa.Column("client_id", sa.Integer(), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employee.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("description", sa.TEXT(), nullable=False),
+        sa.Column("price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("status", order_status_enum, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+        sa.Column("finished_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column("branch", branch_enum, nullable=True),
+        sa.PrimaryKeyConstraint("id", "created_at", name="orders_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    # On the still-empty parent these are instant; ATTACH then adopts the legacy indexes
+    op.create_index("idx_orders_client_status_created", "orders", ["client_id", "status", sa.text("created_at DESC")])
+    op.create_index("idx_orders_employee_status_created", "orders", ["employee_id", "status", sa.text("created_at DESC")])
+    op.create_index("idx_status", "orders", ["status"])
+    op.create_index("idx_created_at", "orders", ["created_at"])
+
+    op.execute(f"ALTER TABLE orders ATTACH PARTITION orders_legacy FOR VALUES FROM (MINVALUE) TO ('{BOUNDARY}')")
+    op.execute("ALTER TABLE orders_legacy DROP CONSTRAINT orders_legacy_range")
+    month_end = _add_months(BOUNDARY, 1)
+    op.execute(
+        f"CREATE TABLE orders_{BOUNDARY:%Y_%m} PARTITION OF orders FOR VALUES FROM ('{BOUNDARY}') TO ('{month_end}')"
+    )
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("client_id", sa.Integer(), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employee.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("branch", branch_enum, nullable=True),
+        sa.Column("description", sa.TEXT(), nullable=False),
+        sa.Column("price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("status", order_status_enum, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("finished_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column("archived_at", sa.TIMESTAMP(), nullable=False, server_default=utc_now),
+    )
+    op.create_index("idx_orders_archive_client_created", "orders_archive", ["client_id", "created_at"])
+    op.create_index("idx_orders_archive_employee_created", "orders_archive", ["employee_id", "created_at"])
+
+
+def downgrade() -> None:
+    # Folds partitions and archive back into one plain table. This copies every order,
+    # so it takes as long as the table is big
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("CREATE TABLE orders_plain (LIKE orders INCLUDING DEFAULTS)")
+    op.execute("""
+        INSERT INTO orders_plain (id, client_id, employee_id, description, price, status, created_at, finished_at, branch)
+        SELECT id, client_id, employee_id, description, price, status, created_at, finished_at, branch FROM orders
+        UNION ALL
+        SELECT id, client_id, employee_id, description, price, status, created_at, finished_at, branch FROM orders_archive
+    """)
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders_plain.id")
+    op.drop_table("orders_archive")
+    op.drop_table("orders")
+    op.rename_table("orders_plain", "orders")
+
+    op.create_primary_key("orders_pkey", "orders", ["id"])
+    op.create_foreign_key("orders_client_id_fkey", "orders", "clients", ["client_id"], ["id"], ondelete="CASCADE")
+    op.create_foreign_key("orders_employee_id_fkey", "orders", "employee", ["employee_id"], ["id"], ondelete="CASCADE")
+    op.create_index("idx_orders_client_status_created", "orders", ["client_id", "status", sa.text("created_at DESC")])
+    op.create_index("idx_orders_employee_status_created", "orders", ["employee_id", "status", sa.text("created_at DESC")])
+    op.create_index("idx_status", "orders", ["status"])
+    op.create_index("idx_created_at", "orders", ["created_at"])
+    op.create_foreign_key("reviews_order_id_fkey", "reviews", "orders", ["order_id"], ["id"], ondelete="CASCADE")
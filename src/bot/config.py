@@ -0,0 +1,42 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class BotSettings(BaseSettings):
+    BOT_TOKEN: str
+
+    # "memory" keeps FSM flows in-process, "bounded" adds TTL/LRU limits to it,
+    # "postgres" persists them in fsm_states
+    FSM_STORAGE: str = "memory"
+    FSM_TTL: float = 1800.0
+    FSM_MAX_ENTRIES: int = 100_000
+
+    # "polling" or "webhook"
+    RUN_MODE: str = "polling"
+    # Polling with more than one worker runs a supervisor that shards updates by user across processes
+    WORKERS: int = 1
+    # Updates waiting per worker before polling pauses for it
+    WORKER_QUEUE_SIZE: int = 1000
+    # Public URL Telegram should call; leave empty when the webhook is registered elsewhere
+    WEBHOOK_BASE_URL: str = ""
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    # Required in webhook mode; Telegram sends it with every update so forged posts can be refused
+    WEBHOOK_SECRET: str = ""
+    # How long to wait for a handler so its reply can ride on the webhook response; 0 always answers at once
+    WEBHOOK_REPLY_TIMEOUT: float = 1.0
+
+    # Outbox sender: global messages per second, min gap between messages to one chat, give-up threshold
+    OUTBOX_RATE: float = 30.0
+    OUTBOX_CHAT_INTERVAL: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 8
+
+    # Prometheus /metrics; 0 disables it. Sharded workers serve on METRICS_PORT + 1, + 2, ...
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 0
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+bot_settings = BotSettings()
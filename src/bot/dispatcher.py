@@ -0,0 +1,52 @@
+from typing import Any
+from aiogram import Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.bot.config import bot_settings
+from src.bot.fsm.postgres_storage import PostgresStorage
+from src.bot.fsm.bounded_memory_storage import BoundedMemoryStorage
+from src.bot.middlewares.identity import IdentityMiddleware
+from src.bot.middlewares.fsm_batch import FSMBatchMiddleware
+from src.bot.middlewares.metrics import UpdateMetricsMiddleware, HandlerMetricsMiddleware
+from src.bot.handlres.user.clients.clients_sign_in import client_sign_in_router
+from src.bot.handlres.user.employee.employee_sign_in import employee_sign_in_router
+from src.bot.handlres.user.employee.employee_handlers import employee_handlers_router
+from src.bot.handlres.user.clients.client_handlers import client_handlers_router
+from src.bot.handlres.user_handlres import user_router
+from src.db.session import Local_Session
+
+
+ROUTERS = (user_router, employee_sign_in_router, employee_handlers_router, client_sign_in_router, client_handlers_router)
+
+
+def used_update_types() -> list[str]:
+    # Without building a dispatcher: a router can only be included into one
+    return sorted({name for router in ROUTERS for name in router.resolve_used_update_types()})
+
+
+def create_storage(kind: str = bot_settings.FSM_STORAGE) -> BaseStorage:
+    if kind == "postgres":
+        return PostgresStorage(Local_Session)
+    if kind == "bounded":
+        return BoundedMemoryStorage(ttl=bot_settings.FSM_TTL, max_entries=bot_settings.FSM_MAX_ENTRIES)
+    if kind == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown FSM storage: {kind}")
+
+
+def create_dispatcher(storage: BaseStorage | None = None, **kwargs: Any) -> Dispatcher:
+    storage = storage or create_storage()
+    dp = Dispatcher(storage=storage, **kwargs)
+    # First, so the identity lookup and FSM writes are counted in the update's DB stats
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    if isinstance(storage, PostgresStorage):
+        dp.update.outer_middleware(FSMBatchMiddleware(storage))
+    # Not on inline queries: the search runs on every keystroke and doesn't care who asks
+    for observer in (dp.message, dp.callback_query):
+        observer.outer_middleware(IdentityMiddleware())
+    # Inner middlewares on the root observers also wrap handlers of the included routers
+    for observer in (dp.message, dp.callback_query, dp.inline_query):
+        observer.middleware(HandlerMetricsMiddleware())
+    dp.include_routers(*ROUTERS)
+    return dp
@@ -3,30 +3,26 @@ from aiogram.filters import BaseFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 
-from src.db.session import Local_Session
-from src.db.crud.client import get_client
-from src.db.crud.employee import get_employee
+from src.db.models.client import Client
+from src.db.models.employee import Employee
 
 
 class RoleFilter(BaseFilter):
     def __init__(self, role: str):
         self.role = role
 
-    async def __call__(self, event: Union[Message, CallbackQuery], state: FSMContext) -> bool:
-        data = await state.get_data()
-        if data.get("role") == self.role:
+    async def __call__(
+        self,
+        event: Union[Message, CallbackQuery],
+        state: FSMContext,
+        client: Client | None = None,
+        employee: Employee | None = None,
+    ) -> bool:
+        if self.role == "client" and client is not None:
+            return True
+        if self.role == "employee" and employee is not None:
             return True
-        
-        user_id = event.from_user.id if hasattr(event, 'from_user') else None
-        if not user_id:
-            return False
-        
-        async with Local_Session() as session:
-            if self.role == "client":
-                client = await get_client(session=session, telegram_user_id=user_id)
-                return client is not None
-            elif self.role == "employee":
-                employee = await get_employee(session=session, telegram_user_id=user_id)
-                return employee is not None
-        
-        return False
\ No newline at end of file
+
+        # Users in the middle of registration aren't in the DB yet
+        data = await state.get_data()
+        return data.get("role") == self.role
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+import sys
+import time
+
+
+class _Record:
+    __slots__ = ("state", "data", "expires_at", "size")
+
+    def __init__(self, expires_at: float):
+        self.state: Optional[str] = None
+        # None instead of an empty dict for users that only have a state
+        self.data: Optional[Dict[str, Any]] = None
+        self.expires_at = expires_at
+        # Footprint of key and record, counted on write so stats() doesn't have to walk the map
+        self.size = 0
+
+
+class BoundedMemoryStorage(BaseStorage):
+    """In-process FSM storage with a sliding per-key TTL and an LRU cap on the number of live entries.
+
+    Every access renews the TTL and moves the key to the end, so the least recently
+    used key is also the first to expire and both limits are enforced from the front.
+    An expired or evicted flow reads back as a cleared context (no state, empty data).
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_entries: int = 100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.expired = 0
+        self.evicted = 0
+        self._bytes = 0
+        self._records: OrderedDict[StorageKey, _Record] = OrderedDict()
+
+    def _remove(self, key: StorageKey) -> None:
+        record = self._records.pop(key, None)
+        if record is not None:
+            self._bytes -= record.size
+
+    def _resize(self, key: StorageKey, record: _Record) -> None:
+        size = sys.getsizeof(key) + sys.getsizeof(record)
+        if record.state:
+            size += sys.getsizeof(record.state)
+        if record.data:
+            size += sys.getsizeof(record.data)
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in record.data.items())
+        self._bytes += size - record.size
+        record.size = size
+
+    def _purge(self, now: float) -> None:
+        records = self._records
+        while records:
+            key, record = next(iter(records.items()))
+            if record.expires_at > now:
+                break
+            self._remove(key)
+            self.expired += 1
+
+    def _get(self, key: StorageKey) -> Optional[_Record]:
+        record = self._records.get(key)
+        if record is None:
+            return None
+        now = time.monotonic()
+        if record.expires_at <= now:
+            self._remove(key)
+            self.expired += 1
+            return None
+        record.expires_at = now + self.ttl
+        self._records.move_to_end(key)
+        return record
+
+    def _get_or_create(self, key: StorageKey) -> _Record:
+        record = self._get(key)
+        if record is None:
+            now = time.monotonic()
+            self._purge(now)
+            record = self._records[key] = _Record(now + self.ttl)
+            self._resize(key, record)
+            while len(self._records) > self.max_entries:
+                self._remove(next(iter(self._records)))
+                self.evicted += 1
+        return record
+
+    def _drop_if_empty(self, key: StorageKey, record: _Record) -> None:
+        if record.state is None and not record.data:
+            self._remove(key)
+        else:
+            self._resize(key, record)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = self._get_or_create(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._drop_if_empty(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self._get(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = self._get_or_create(key)
+        record.data = data.copy() if data else None
+        self._drop_if_empty(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self._get(key)
+        return record.data.copy() if record and record.data else {}
+
+    async def close(self) -> None:
+        self._records.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        # Purging pops only the expired head of the map, so a scrape stays O(1) amortised
+        self._purge(time.monotonic())
+        return {
+            "entries": len(self._records),
+            "bytes": sys.getsizeof(self._records) + self._bytes,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,117 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.db.models.fsm import FSMRecord
+
+
+class _PendingRecord:
+    __slots__ = ("state", "data", "dirty")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any]):
+        self.state = state
+        self.data = data
+        self.dirty = False
+
+
+class PostgresStorage(BaseStorage):
+    """FSM storage in the fsm_states table, shared by every bot process.
+
+    Inside `batch()` each key is read at most once and all state/data changes are
+    written back with a single upsert when the batch ends.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker):
+        self.session_maker = session_maker
+        self._batch: ContextVar[Dict[str, _PendingRecord] | None] = ContextVar("fsm_batch", default=None)
+
+    @staticmethod
+    def _make_key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+    async def _read(self, key: str) -> tuple[Optional[str], Dict[str, Any]]:
+        async with self.session_maker() as session:
+            res = await session.execute(select(FSMRecord.state, FSMRecord.data).where(FSMRecord.key == key))
+            row = res.one_or_none()
+        return (row.state, dict(row.data)) if row else (None, {})
+
+    async def _upsert(self, key: str, **values: Any) -> None:
+        async with self.session_maker() as session:
+            stmt = insert(FSMRecord).values(key=key, **values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FSMRecord.key],
+                set_={**values, "updated_at": func.timezone("utc", func.now())},
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def _delete(self, key: str) -> None:
+        async with self.session_maker() as session:
+            await session.execute(delete(FSMRecord).where(FSMRecord.key == key))
+            await session.commit()
+
+    async def _pending(self, key: StorageKey) -> tuple[str, _PendingRecord | None]:
+        db_key = self._make_key(key)
+        batch = self._batch.get()
+        if batch is None:
+            return db_key, None
+        record = batch.get(db_key)
+        if record is None:
+            record = batch[db_key] = _PendingRecord(*await self._read(db_key))
+        return db_key, record
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        token = self._batch.set({})
+        try:
+            yield
+        finally:
+            batch = self._batch.get()
+            self._batch.reset(token)
+            for db_key, record in batch.items():
+                if not record.dirty:
+                    continue
+                # A cleared context (state.clear()) leaves nothing worth keeping
+                if record.state is None and not record.data:
+                    await self._delete(db_key)
+                else:
+                    await self._upsert(db_key, state=record.state, data=record.data)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        db_key, record = await self._pending(key)
+        if record is None:
+            await self._upsert(db_key, state=state)
+            return
+        record.state = state
+        record.dirty = True
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        db_key, record = await self._pending(key)
+        if record is None:
+            state, _ = await self._read(db_key)
+            return state
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        db_key, record = await self._pending(key)
+        if record is None:
+            await self._upsert(db_key, data=data.copy())
+            return
+        record.data = data.copy()
+        record.dirty = True
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        db_key, record = await self._pending(key)
+        if record is None:
+            _, data = await self._read(db_key)
+            return data
+        return record.data.copy()
+
+    async def close(self) -> None:
+        pass
@@ -1,23 +1,40 @@
-from aiogram import F, Router, Bot
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardRemove
-from aiogram.filters import CommandStart
+from aiogram import F, Router
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, ReplyKeyboardRemove, InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+from aiogram.utils.text_decorations import html_decoration as html
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from src.bot.filters.user.role_filter import RoleFilter
-from src.db.crud.employee import get_employees_paginated, get_employees_count, get_employee_by_id
-from src.db.crud.client import get_client
-from src.db.crud.order import create_order, get_orders_by_client, get_order_by_id, update_order_status
-from src.db.crud.review import create_review, get_review_by_order, update_employee_rating, get_reviews_by_employee
-from src.bot.kbd.user_keyboard import create_employees_keyboard, brunch_markup, order_confirm_kb, create_client_orders_keyboard, create_complete_order_keyboard, create_rating_keyboard
+from src.db.crud.employee import get_employees_paginated, get_employee_by_id, iter_branch_chat_ids, search_employees
+from src.db.models.client import Client
+from src.db.models.employee import Employee
+from src.db.crud.outbox import enqueue_message, enqueue_broadcast
+from src.db.crud.order import create_order, create_open_order, get_orders_page, get_order_with_details, transition_order_status, get_client_order_stats
+from src.db.crud.review import create_review, get_reviews_page
+from src.bot.kbd.user_keyboard import create_employees_keyboard, brunch_markup, order_confirm_kb, create_client_orders_keyboard, create_complete_order_keyboard, create_rating_keyboard, create_reviews_keyboard, create_open_order_keyboard, create_search_results_keyboard, parse_orders_callback, ORDER_TABS, ORDERS_PER_PAGE
+from src.bot.handlres.user_handlres import format_reviews
 from src.db.session import Local_Session
+from src.cache.render_cache import render_cache, branch_scope, employee_scope
+from src.cache.search_cache import search_cache
 from src.db.enums import BranchEnum, OrderStatusEnum
 
+from decimal import Decimal
+import logging
+
+logger = logging.getLogger(__name__)
+
 client_handlers_router = Router()
 client_handlers_router.message.filter(RoleFilter("client"))
 client_handlers_router.callback_query.filter(RoleFilter("client"))
 
 EMPLOYEES_PER_PAGE = 5
+PROFILE_REVIEWS_LIMIT = 10
+SEARCH_RESULTS_LIMIT = 10
+# Shorter queries have no trigrams to look up in the index
+SEARCH_MIN_LENGTH = 3
+# Telegram caches inline results for this long, so typing the same prefix again never reaches the bot
+INLINE_CACHE_TIME = 60
 
 
 class CreateOrder(StatesGroup):
@@ -31,23 +48,114 @@ class CreateReview(StatesGroup):
     comment = State()
 
 
+class SearchEmployees(StatesGroup):
+    query = State()
+
+
 def format_employee_info(employee) -> str:
-    return (f"👤 <b>{employee.first_name} {employee.last_name}</b>\n"
-            f"📞 Phone: {employee.phone}\n"
+    skills = f"🛠 Skills: {html.quote(employee.skills)}\n" if employee.skills else ""
+    return (f"👤 <b>{html.quote(employee.first_name)} {html.quote(employee.last_name)}</b>\n"
+            f"📞 Phone: {html.quote(employee.phone)}\n"
             f"🎂 Date of birth: {employee.birth_date}\n"
             f"💼 Branch: {employee.branch.value}\n"
+            f"{skills}"
             f"⭐ Rating: {employee.rating}\n"
             f"📊 Reviews: {employee.total_reviews}")
 
 
 @client_handlers_router.message(RoleFilter("client"), F.text=="🔍 Find freelancer")
 async def find_employee_cmd(message: Message):
-    await message.answer("Choose direction/specialization:", reply_markup=brunch_markup)
+    return message.answer("Choose direction/specialization:", reply_markup=brunch_markup)
+
+
+async def find_employees(query: str) -> list:
+    key = " ".join(query.lower().split())
+    employees = search_cache.get(key)
+    if employees is None:
+        async with Local_Session() as session:
+            employees = await search_employees(session, key, limit=SEARCH_RESULTS_LIMIT)
+        search_cache.set(key, employees)
+    return employees
+
+
+@client_handlers_router.message(F.text == "🔎 Search")
+async def search_cmd(message: Message, state: FSMContext):
+    await state.set_state(SearchEmployees.query)
+    return message.answer("Enter a freelancer's name or a skill (e.g. python, montage):")
+
+
+@client_handlers_router.message(SearchEmployees.query)
+async def process_search_query(message: Message, state: FSMContext):
+    query = (message.text or "").strip()
+    if len(query) < SEARCH_MIN_LENGTH:
+        return message.answer(f"Enter at least {SEARCH_MIN_LENGTH} characters:")
+
+    await state.clear()
+    employees = await find_employees(query)
+    if not employees:
+        return message.answer("Nobody found. Try another name or skill.")
+
+    text = f"🔎 <b>Search results for \"{html.quote(query)}\":</b>\n\n" + "".join(
+        format_employee_info(employee) + "\n\n" for employee in employees
+    )
+    return message.answer(text, reply_markup=create_search_results_keyboard(employees), parse_mode="HTML")
+
+
+# Inline queries aren't role-filtered: anyone can share a freelancer card with @bot <query>
+@client_handlers_router.inline_query()
+async def inline_search(inline_query: InlineQuery):
+    query = inline_query.query.strip()
+    employees = await find_employees(query) if len(query) >= SEARCH_MIN_LENGTH else []
+
+    results = [
+        InlineQueryResultArticle(
+            id=str(employee.id),
+            title=f"{employee.first_name} {employee.last_name} ⭐ {employee.rating}",
+            description=f"{employee.branch.value}" + (f" · {employee.skills}" if employee.skills else ""),
+            input_message_content=InputTextMessageContent(message_text=format_employee_info(employee), parse_mode="HTML"),
+        )
+        for employee in employees
+    ]
+    return inline_query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=False)
+
+
+def format_employees_page(employees, branch: BranchEnum) -> str:
+    return f"📋 <b>List of freelancers ({branch.value}):</b>\n\n" + "".join(
+        format_employee_info(employee) + "\n\n" for employee in employees
+    )
+
+
+async def render_employees_page(
+    branch: BranchEnum, page: int = 0, direction: str | None = None, cursor: tuple[Decimal, int] | None = None
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    # Pages are cached per branch version, registrations and new ratings bump it
+    view_key = (page, direction, cursor)
+    view = render_cache.get_view(branch_scope(branch), view_key)
+    if view is not None:
+        return view
+
+    async with Local_Session() as session:
+        if direction == "p":
+            employees, has_prev = await get_employees_paginated(session=session, branch=branch, limit=EMPLOYEES_PER_PAGE, before=cursor)
+            has_next = True
+        elif direction == "n":
+            employees, has_next = await get_employees_paginated(session=session, branch=branch, limit=EMPLOYEES_PER_PAGE, after=cursor)
+            has_prev = True
+        else:
+            employees, has_next = await get_employees_paginated(session=session, branch=branch, limit=EMPLOYEES_PER_PAGE)
+            has_prev = False
+
+    if not employees:
+        view = (f"No freelancers found in direction {branch.value}" if direction is None else "Freelancers not found", None)
+    else:
+        keyboard = create_employees_keyboard(employees, branch=branch.value, page=page, has_prev=has_prev and page > 0, has_next=has_next)
+        view = (format_employees_page(employees, branch), keyboard)
+    render_cache.set_view(branch_scope(branch), view_key, view)
+    return view
 
 
 @client_handlers_router.callback_query(F.data.startswith("branch:"))
-async def select_branch(callback: CallbackQuery, state: FSMContext):
-    await callback.answer()
+async def select_branch(callback: CallbackQuery):
     branch_value = callback.data.split(":", 1)[1]
     
     try:
@@ -56,61 +164,30 @@ async def select_branch(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Invalid direction", show_alert=True)
         return
     
-    page = 0
-    await state.update_data(employees_page=page, selected_branch=branch_value)
-    
-    async with Local_Session() as session:
-        employees = await get_employees_paginated(session=session, offset=page * EMPLOYEES_PER_PAGE, limit=EMPLOYEES_PER_PAGE, branch=branch)
-        total_count = await get_employees_count(session=session, branch=branch)
-    
-    if not employees:
-        await callback.message.edit_text(f"No freelancers found in direction {branch.value}")
-        return
-    
-    text = f"📋 <b>List of freelancers ({branch.value}):</b>\n\n"
-    for employee in employees:
-        text += format_employee_info(employee) + "\n\n"
-    
-    keyboard = create_employees_keyboard(employees, page=page, total_count=total_count)
+    await callback.answer()
+    text, keyboard = await render_employees_page(branch)
     await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 
 @client_handlers_router.callback_query(F.data.startswith("emp_page:"))
-async def paginate_employees(callback: CallbackQuery, state: FSMContext):
-    await callback.answer()
-    page = int(callback.data.split(":")[1])
-    await state.update_data(employees_page=page)
-    
-    data = await state.get_data()
-    branch_value = data.get("selected_branch")
-    branch = None
-    if branch_value:
-        try:
-            branch = BranchEnum(branch_value)
-        except ValueError:
-            pass
-    
-    async with Local_Session() as session:
-        employees = await get_employees_paginated(session=session, offset=page * EMPLOYEES_PER_PAGE, limit=EMPLOYEES_PER_PAGE, branch=branch)
-        total_count = await get_employees_count(session=session, branch=branch)
-    
-    if not employees:
-        await callback.message.edit_text("Freelancers not found")
+async def paginate_employees(callback: CallbackQuery):
+    try:
+        _, branch_value, direction, page, rating, employee_id = callback.data.split(":")
+        branch = BranchEnum(branch_value)
+        cursor = (Decimal(rating), int(employee_id))
+        page = int(page)
+    except (ValueError, ArithmeticError):
+        await callback.answer("This list is outdated, open it again", show_alert=True)
         return
-
-    branch_text = f" ({branch.value})" if branch else ""
-    text = f"📋 <b>List of freelancers{branch_text}:</b>\n\n"
-    for employee in employees:
-        text += format_employee_info(employee) + "\n\n"
     
-    keyboard = create_employees_keyboard(employees, page=page, total_count=total_count)
+    await callback.answer()
+    text, keyboard = await render_employees_page(branch, page, "p" if direction == "p" else "n", cursor)
     await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 
 
 @client_handlers_router.callback_query(F.data.startswith("emp_select:"))
 async def select_employee(callback: CallbackQuery, state: FSMContext):
-    await callback.answer()
     employee_id = int(callback.data.split(":")[1])
     
     async with Local_Session() as session:
@@ -120,7 +197,8 @@ async def select_employee(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Worker not found", show_alert=True)
         return
 
-    await state.update_data(employee_id=employee_id)
+    await callback.answer()
+    await state.update_data(employee_id=employee_id, branch=None)
     await state.set_state(CreateOrder.description)
     await callback.message.answer(
         "Describe your task:",
@@ -128,50 +206,62 @@ async def select_employee(callback: CallbackQuery, state: FSMContext):
     )
 
 
+@client_handlers_router.callback_query(F.data.startswith("open_order:"))
+async def start_open_order(callback: CallbackQuery, state: FSMContext):
+    try:
+        branch = BranchEnum(callback.data.split(":", 1)[1])
+    except ValueError:
+        await callback.answer("Invalid direction", show_alert=True)
+        return
+
+    await callback.answer()
+    await state.update_data(employee_id=None, branch=branch.value)
+    await state.set_state(CreateOrder.description)
+    await callback.message.answer(
+        f"Your order will be offered to every freelancer in {branch.value}, the first to take it gets it.\n\n"
+        "Describe your task:",
+        reply_markup=ReplyKeyboardRemove()
+    )
+
+
 @client_handlers_router.callback_query(F.data.startswith("emp_profile:"))
 async def show_employee_profile(callback: CallbackQuery):
-    await callback.answer()
     employee_id = int(callback.data.split(":")[1])
-    
-    async with Local_Session() as session:
-        employee = await get_employee_by_id(session, employee_id)
-        if not employee:
-            await callback.answer("Worker not found", show_alert=True)
-            return
 
-        reviews = await get_reviews_by_employee(session, employee_id)
+    view = render_cache.get_view(employee_scope(employee_id), "profile")
+    if view is None:
+        async with Local_Session() as session:
+            employee = await get_employee_by_id(session, employee_id)
+            if not employee:
+                await callback.answer("Worker not found", show_alert=True)
+                return
+
+            reviews, has_more = await get_reviews_page(session, employee_id, limit=PROFILE_REVIEWS_LIMIT)
 
         text = "👤 <b>Freelancer profile:</b>\n\n" + format_employee_info(employee)
 
         if reviews:
-            text += "\n\n📝 <b>Reviews:</b>\n"
-            for review in reviews[:10]:
-                stars = "⭐" * review.rating
-                text += f"\n{stars} ({review.rating}/5)\n"
-                if review.comment:
-                    text += f"{review.comment}\n"
-                text += f"📅 {review.created_at.strftime('%d.%m.%Y')}\n"
+            text += "\n\n📝 <b>Reviews:</b>\n" + format_reviews(reviews)
         else:
             text += "\n\n📝 No reviews yet."
-    
-    await callback.message.answer(text, parse_mode="HTML")
+
+        keyboard = create_reviews_keyboard(employee_id, reviews, has_older=has_more)
+        view = (text, keyboard)
+        render_cache.set_view(employee_scope(employee_id), "profile", view)
+
+    await callback.answer()
+    text, keyboard = view
+    await callback.message.answer(text, reply_markup=keyboard, parse_mode="HTML")
 
 
 @client_handlers_router.message(F.text == "👤 Profile")
-async def show_client_profile(message: Message):
-    user_id = message.from_user.id
+async def show_client_profile(message: Message, client: Client | None):
+    if not client:
+        await message.answer("Error: client not found.")
+        return
 
     async with Local_Session() as session:
-        client = await get_client(session, user_id)
-        if not client:
-            await message.answer("Error: client not found.")
-            return
-        
-        all_orders = await get_orders_by_client(session, client.id)
-        completed_orders = await get_orders_by_client(session, client.id, OrderStatusEnum.COMPLETED)
-        
-        total_orders = len(all_orders)
-        completed_count = len(completed_orders)
+        stats = await get_client_order_stats(session, client.id)
         
         text = (
             f"👤 <b>Your profile:</b>\n\n"
@@ -180,11 +270,11 @@ async def show_client_profile(message: Message):
             f"🎂 <b>Date of birth:</b> {client.birth_date}\n"
             f"📅 <b>Registration date:</b> {client.created_at.strftime('%d.%m.%Y')}\n\n"
             f"📊 <b>Order statistics:</b>\n"
-            f"📋 Total orders: {total_orders}\n"
-            f"✅ Completed: {completed_count}"
+            f"📋 Total orders: {stats.total}\n"
+            f"✅ Completed: {stats.count(OrderStatusEnum.COMPLETED)}"
         )
     
-    await message.answer(text, parse_mode="HTML")
+    return message.answer(text, parse_mode="HTML")
 
 
 @client_handlers_router.callback_query(F.data == "emp_none")
@@ -200,11 +290,11 @@ async def process_description(message: Message, state: FSMContext):
 
     await state.update_data(description=message.text.strip())
     await state.set_state(CreateOrder.price)
-    await message.answer("Specify the approximate budget (in USD):")
+    return message.answer("Specify the approximate budget (in USD):")
 
 
 @client_handlers_router.message(CreateOrder.price)
-async def process_price(message: Message, state: FSMContext):
+async def process_price(message: Message, state: FSMContext, client: Client | None):
     if not message.text:
         await message.answer("Please specify the budget as a number.")
         return
@@ -222,19 +312,28 @@ async def process_price(message: Message, state: FSMContext):
     
     data = await state.get_data()
     employee_id = data.get("employee_id")
+    description = data.get("description")
+    price_value = data.get("price")
+
+    if data.get("branch") and client:
+        await state.set_state(CreateOrder.confirm)
+        return message.answer(
+            f"Confirm order:\n\n"
+            f"📢 <b>Offered to:</b> all freelancers in {data['branch']}\n"
+            f"📝 <b>Task:</b> {html.quote(description)}\n"
+            f"💰 <b>Budget:</b> {price_value} USD",
+            reply_markup=order_confirm_kb,
+            parse_mode="HTML"
+        )
     
     async with Local_Session() as session:
         employee = await get_employee_by_id(session, employee_id)
-        client = await get_client(session, message.from_user.id)
     
     if not employee or not client:
         await message.answer("Error: could not find data. Try again.")
         await state.clear()
         return
     
-    description = data.get("description")
-    price_value = data.get("price")
-    
     confirm_text = (
         f"Confirm order:\n\n"
         f"👨‍💻 <b>Freelancer:</b> {employee.first_name} {employee.last_name}\n"
@@ -247,28 +346,74 @@ async def process_price(message: Message, state: FSMContext):
     await message.answer(confirm_text, reply_markup=order_confirm_kb, parse_mode="HTML")
 
 
+async def publish_open_order(client: Client, branch: BranchEnum, description: str, price: float) -> tuple[int | None, int]:
+    """Create an open order and queue an offer to every freelancer in the branch, all in one transaction."""
+    async with Local_Session() as session:
+        order = await create_open_order(session, client.id, branch, description, price)
+        text = (
+            f"📢 <b>Open order #{order.id}</b>\n\n"
+            f"📝 <b>Task:</b> {html.quote(description)}\n"
+            f"💰 <b>Budget:</b> {price} USD\n\n"
+            f"The first freelancer to take it gets the order."
+        )
+        markup = create_open_order_keyboard(order.id).model_dump(exclude_none=True)
+
+        recipients = 0
+        # Recipients stream on a second connection, the server-side cursor stays open while this one inserts
+        async with Local_Session() as read_session:
+            async for chat_ids in iter_branch_chat_ids(read_session, branch):
+                chat_ids = [chat_id for chat_id in chat_ids if chat_id != client.telegram_user_id]
+                await enqueue_broadcast(session, chat_ids, text, reply_markup=markup, order_id=order.id)
+                recipients += len(chat_ids)
+
+        if not recipients:
+            await session.rollback()
+            return None, 0
+        order_id = order.id
+        await session.commit()
+    return order_id, recipients
+
+
 @client_handlers_router.callback_query(F.data == "order_confirm")
-async def confirm_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
-    await callback.answer()
-    
+async def confirm_order(callback: CallbackQuery, state: FSMContext, client: Client | None):
     try:
         current_state = await state.get_state()
         if current_state != CreateOrder.confirm:
             await callback.answer("Order has already been processed or cancelled", show_alert=True)
             return
+        await callback.answer()
 
         data = await state.get_data()
         employee_id = data.get("employee_id")
+        branch_value = data.get("branch")
         description = data.get("description")
         price = data.get("price")
 
-        if not employee_id or not description or price is None:
+        if not (employee_id or branch_value) or not description or price is None:
             await callback.message.answer("Error: not all data filled. Try again.")
             await state.clear()
             return
+
+        if branch_value:
+            if not client:
+                await callback.message.answer("Error: could not find data. Try again.")
+                await state.clear()
+                return
+
+            order_id, recipients = await publish_open_order(client, BranchEnum(branch_value), description, price)
+            await state.clear()
+            if not order_id:
+                await callback.message.edit_text(f"No freelancers found in direction {branch_value}")
+                return
+            await callback.message.edit_text(
+                f"✅ <b>Order #{order_id} created!</b>\n\n"
+                f"It was offered to {recipients} freelancers in {branch_value}.\n"
+                f"The first one to take it will start working on it.",
+                parse_mode="HTML"
+            )
+            return
         
         async with Local_Session() as session:
-            client = await get_client(session, callback.from_user.id)
             employee = await get_employee_by_id(session, employee_id)
             
             if not client or not employee:
@@ -277,9 +422,6 @@ async def confirm_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
                 return
             
             employee_name = f"{employee.first_name} {employee.last_name}"
-            employee_telegram_id = employee.telegram_user_id
-            client_name = f"{client.first_name} {client.last_name}"
-            client_phone = client.phone
             
             order = await create_order(
                 session=session,
@@ -289,55 +431,40 @@ async def confirm_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
                 price=price
             )
             order_id = order.id
-            await session.commit()
-        
-        try:
-            await bot.send_message(
-                employee_telegram_id,
+            # Committed together with the order, so the freelancer is notified iff the order exists
+            await enqueue_message(
+                session,
+                employee.telegram_user_id,
                 f"🔔 <b>Новый заказ #{order_id}!</b>\n\n"
-                f"👤 <b>Клиент:</b> {client_name}\n"
-                f"📞 <b>Телефон клиента:</b> {client_phone}\n"
-                f"📝 <b>Задача:</b> {description}\n"
+                f"👤 <b>Клиент:</b> {html.quote(client.first_name)} {html.quote(client.last_name)}\n"
+                f"📞 <b>Телефон клиента:</b> {html.quote(client.phone)}\n"
+                f"📝 <b>Задача:</b> {html.quote(description)}\n"
                 f"💰 <b>Бюджет:</b> {price} USD\n\n"
-                f"Перейдите в раздел <b>📋 Мои заказы</b> для принятия решения.",
-                parse_mode="HTML"
+                f"Перейдите в раздел <b>📋 Мои заказы</b> для принятия решения."
             )
-        except Exception as e:
-            print(f"⚠️ Не удалось отправить уведомление исполнителю {employee_telegram_id}: {e}")
+            await session.commit()
         
         try:
             await callback.message.edit_text(
-<<<<<<< HEAD
-                f"✅ <b>Order created!</b>\n\n"
+                f"✅ <b>Order #{order_id} created!</b>\n\n"
                 f"Your order has been sent to freelancer {employee_name}.\n"
                 f"Wait for confirmation.",
-=======
-                f"✅ <b>Заказ #{order_id} создан!</b>\n\n"
-                f"Ваш заказ отправлен исполнителю {employee_name}.\n"
-                f"Ожидайте подтверждения.",
->>>>>>> 6e871ce3d37db7d1f162c7fe1160dc98c168151f
                 parse_mode="HTML"
             )
         except Exception:
             await callback.message.answer(
-<<<<<<< HEAD
-                f"✅ <b>Order created!</b>\n\n"
+                f"✅ <b>Order #{order_id} created!</b>\n\n"
                 f"Your order has been sent to freelancer {employee_name}.\n"
                 f"Wait for confirmation.",
-=======
-                f"✅ <b>Заказ #{order_id} создан!</b>\n\n"
-                f"Ваш заказ отправлен исполнителю {employee_name}.\n"
-                f"Ожидайте подтверждения.",
->>>>>>> 6e871ce3d37db7d1f162c7fe1160dc98c168151f
                 parse_mode="HTML"
             )
         
         await state.clear()
         
-    except Exception as e:
+    except Exception:
+        logger.exception("Failed to create an order")
         await callback.message.answer(f"An error occurred while creating the order. Try again later.")
         await state.clear()
-        print(f"❌ Ошибка в confirm_order: {e}")
 
 
 @client_handlers_router.callback_query(F.data == "order_cancel")
@@ -351,7 +478,12 @@ async def cancel_order_creation(callback: CallbackQuery, state: FSMContext):
 
 
 def format_client_order_info(order, employee=None) -> str:
-    employee_info = f"{employee.first_name} {employee.last_name}" if employee else "Unknown freelancer"
+    if employee:
+        employee_info = f"{employee.first_name} {employee.last_name}"
+    elif order.branch and order.employee_id is None:
+        employee_info = f"📢 open to everyone in {order.branch.value}"
+    else:
+        employee_info = "Unknown freelancer"
     status_text = {
         "PENDING": "⏳ Waiting for freelancer confirmation",
         "IN_PROGRESS": "✅ Confirmed by freelancer - in progress",
@@ -370,25 +502,42 @@ def format_client_order_info(order, employee=None) -> str:
     )
 
 
+async def render_client_orders(client_id: int, tab: str, before=None) -> tuple[str, InlineKeyboardMarkup]:
+    async with Local_Session() as session:
+        orders, has_more = await get_orders_page(session, ORDER_TABS[tab][1], client_id=client_id, limit=ORDERS_PER_PAGE, before=before)
+
+    text = "📋 <b>Your orders:</b>\n\n" + ("Select an order to view:" if orders else "No orders here yet.")
+    return text, create_client_orders_keyboard(orders, tab=tab, has_more=has_more)
+
+
 @client_handlers_router.message(F.text == "📋 My orders")
-async def show_client_orders(message: Message):
-    user_id = message.from_user.id
+async def show_client_orders(message: Message, client: Client | None):
+    if not client:
+        await message.answer("Error: client not found.")
+        return
 
-    async with Local_Session() as session:
-        client = await get_client(session, user_id)
-        if not client:
-            await message.answer("Error: client not found.")
-            return
+    text, keyboard = await render_client_orders(client.id, "pending")
+    return message.answer(text, reply_markup=keyboard, parse_mode="HTML")
 
-        orders = await get_orders_by_client(session, client.id)
 
-    if not orders:
-        await message.answer("You have no orders yet.")
+@client_handlers_router.callback_query(F.data.startswith("client_orders:"))
+async def paginate_client_orders(callback: CallbackQuery, client: Client | None):
+    # RoleFilter also lets through users who are still signing up, before the row exists
+    if not client:
+        await callback.answer("Error: client not found.", show_alert=True)
+        return
+    try:
+        tab, cursor = parse_orders_callback(callback.data)
+    except ValueError:
+        await callback.answer("This list is outdated, open it again", show_alert=True)
         return
 
-    text = "📋 <b>Your orders:</b>\n\nSelect an order to view:"
-    keyboard = create_client_orders_keyboard(orders)
-    await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer()
+    text, keyboard = await render_client_orders(client.id, tab, before=cursor)
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    except TelegramBadRequest:
+        pass
 
 
 @client_handlers_router.callback_query(F.data.startswith("client_order_view:"))
@@ -397,15 +546,13 @@ async def view_client_order(callback: CallbackQuery):
     order_id = int(callback.data.split(":")[1])
 
     async with Local_Session() as session:
-        order = await get_order_by_id(session, order_id)
+        order = await get_order_with_details(session, order_id)
         if not order:
             await callback.message.answer("Order not found.")
             return
         
-        employee = await get_employee_by_id(session, order.employee_id)
-        order_text = format_client_order_info(order, employee)
-        
-        existing_review = await get_review_by_order(session, order_id)
+        order_text = format_client_order_info(order, order.employee)
+        existing_review = order.review
         
         if order.status == OrderStatusEnum.IN_PROGRESS and not existing_review:
             keyboard = create_complete_order_keyboard(order_id)
@@ -422,59 +569,62 @@ async def view_client_order(callback: CallbackQuery):
 
 
 @client_handlers_router.callback_query(F.data.startswith("order_complete:"))
-async def complete_order(callback: CallbackQuery, state: FSMContext):
-    await callback.answer()
+async def complete_order(callback: CallbackQuery, state: FSMContext, client: Client | None):
+    if not client:
+        await callback.answer("Error: client not found.", show_alert=True)
+        return
     order_id = int(callback.data.split(":")[1])
     
+    # Reviews are only left on completed orders, so winning IN_PROGRESS -> COMPLETED also means no review exists yet
     async with Local_Session() as session:
-        order = await get_order_by_id(session, order_id)
-        if not order:
-            await callback.message.answer("Order not found.")
-            return
+        order = await transition_order_status(
+            session, order_id, OrderStatusEnum.IN_PROGRESS, OrderStatusEnum.COMPLETED, client_id=client.id
+        )
+        if order:
+            employee = await session.get(Employee, order.employee_id)
+            await enqueue_message(
+                session,
+                employee.telegram_user_id,
+                f"🏁 <b>Order #{order_id} completed!</b>\n\n"
+                f"{html.quote(client.first_name)} {html.quote(client.last_name)} marked the order as completed."
+            )
+            await session.commit()
 
-        if order.status != OrderStatusEnum.IN_PROGRESS:
-            await callback.answer("This order cannot be completed.", show_alert=True)
-            return
+    if not order:
+        await callback.answer("This order cannot be completed.", show_alert=True)
+        return
 
-        existing_review = await get_review_by_order(session, order_id)
-        if existing_review:
-            await callback.answer("Review for this order already left.", show_alert=True)
-            return
-        
-        updated_order = await update_order_status(session, order_id, OrderStatusEnum.COMPLETED)
-        if updated_order:
-            await state.update_data(order_id=order_id, employee_id=order.employee_id, client_id=order.client_id)
-            await state.set_state(CreateReview.rating)
-            
-            keyboard = create_rating_keyboard(order_id)
-            await callback.message.edit_text(
-                "✅ <b>Order completed!</b>\n\n"
-                "Please leave a review of the freelancer's work.\n"
-                "Choose a rating (1 to 5 stars):",
-                reply_markup=keyboard,
-                parse_mode="HTML"
-            )
-        else:
-            await callback.message.answer("Error completing order.")
+    await callback.answer()
+    await state.update_data(order_id=order_id, employee_id=order.employee_id, client_id=order.client_id)
+    await state.set_state(CreateReview.rating)
+    
+    keyboard = create_rating_keyboard(order_id)
+    await callback.message.edit_text(
+        "✅ <b>Order completed!</b>\n\n"
+        "Please leave a review of the freelancer's work.\n"
+        "Choose a rating (1 to 5 stars):",
+        reply_markup=keyboard,
+        parse_mode="HTML"
+    )
 
 
 @client_handlers_router.callback_query(F.data.startswith("rating:"))
 async def select_rating(callback: CallbackQuery, state: FSMContext):
-    await callback.answer()
     parts = callback.data.split(":")
     order_id = int(parts[1])
     rating = int(parts[2])
     
     async with Local_Session() as session:
-        order = await get_order_by_id(session, order_id)
+        order = await get_order_with_details(session, order_id)
         if not order:
-            await callback.message.answer("Order not found.")
+            await callback.answer("Order not found.", show_alert=True)
             return
 
-        existing_review = await get_review_by_order(session, order_id)
-        if existing_review:
+        if order.review:
             await callback.answer("Review for this order already left.", show_alert=True)
             return
+
+        await callback.answer()
         
         await state.update_data(
             rating=rating,
@@ -518,8 +668,6 @@ async def process_review_comment(message: Message, state: FSMContext):
             comment=comment
         )
 
-        await update_employee_rating(session, employee_id)
-
     await message.answer(
         f"✅ <b>Thank you for the review!</b>\n\n"
         f"Your review has been successfully saved.",
@@ -85,7 +85,8 @@ async def get_birth_date(message: Message, state: FSMContext):
         await message.answer("Invalid date format. Try again (YYYY-MM-DD or DD.MM.YYYY).")
         return
 
-    await state.update_data(birth_date=bd)
+    # FSM data must stay JSON-serializable for persistent storages
+    await state.update_data(birth_date=bd.isoformat())
 
     data = await state.get_data()
     summary = (f"Please confirm the data:\n"
@@ -112,7 +113,7 @@ async def confirm_registration(call: CallbackQuery, state: FSMContext):
             first_name=data.get('first_name'),
             last_name=data.get('last_name'),
             phone=data.get('phone'),
-            birth_date=data.get('birth_date')
+            birth_date=datetime.date.fromisoformat(data.get('birth_date'))
         )
 
     await call.message.answer("Registration successful ✅")
@@ -1,21 +1,26 @@
 from aiogram import F, Router, Bot
-from aiogram.types import Message, CallbackQuery
-from aiogram.filters import CommandStart
-from aiogram.fsm.context import FSMContext
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup
+from aiogram.utils.text_decorations import html_decoration as html
+from aiogram.exceptions import TelegramBadRequest
 
 from src.bot.filters.user.role_filter import RoleFilter
-from src.db.crud.employee import get_employee
-from src.db.crud.order import get_orders_by_employee, update_order_status, get_order_by_id
-from src.db.crud.client import get_client_by_id
-from src.db.crud.review import get_reviews_by_employee
+from src.db.models.employee import Employee
+from src.db.models.client import Client
+from src.db.crud.outbox import enqueue_message, cancel_order_messages
+from src.db.crud.order import get_orders_page, transition_order_status, claim_open_order, get_order_with_details, get_employee_order_stats
+from src.db.crud.review import get_reviews_page
 from src.db.session import Local_Session
 from src.db.enums import OrderStatusEnum
-from src.bot.kbd.user_keyboard import create_employee_orders_keyboard, create_order_action_keyboard
+from src.bot.kbd.user_keyboard import create_employee_orders_keyboard, create_order_action_keyboard, create_reviews_keyboard, parse_orders_callback, ORDER_TABS, ORDERS_PER_PAGE
+from src.bot.handlres.user_handlres import format_reviews
+from src.bot.reports import start_orders_export
 
 employee_handlers_router = Router()
 employee_handlers_router.message.filter(RoleFilter("employee"))
 employee_handlers_router.callback_query.filter(RoleFilter("employee"))
 
+PROFILE_REVIEWS_LIMIT = 5
+
 
 def format_order_info(order, client=None) -> str:
     if client:
@@ -44,25 +49,42 @@ def format_order_info(order, client=None) -> str:
     )
 
 
-@employee_handlers_router.message(F.text == "📋 My orders")
-async def show_employee_orders(message: Message):
-    user_id = message.from_user.id
-    
+async def render_employee_orders(employee_id: int, tab: str, before=None) -> tuple[str, InlineKeyboardMarkup]:
     async with Local_Session() as session:
-        employee = await get_employee(session, user_id)
-        if not employee:
-            await message.answer("Error: freelancer not found.")
-            return
+        orders, has_more = await get_orders_page(session, ORDER_TABS[tab][1], employee_id=employee_id, limit=ORDERS_PER_PAGE, before=before)
+
+    text = "📋 <b>Your orders:</b>\n\n" + ("Select an order to view:" if orders else "No orders here yet.")
+    return text, create_employee_orders_keyboard(orders, tab=tab, has_more=has_more)
 
-        orders = await get_orders_by_employee(session, employee.id)
 
-    if not orders:
-        await message.answer("You have no orders yet.")
+@employee_handlers_router.message(F.text == "📋 My orders")
+async def show_employee_orders(message: Message, employee: Employee | None):
+    if not employee:
+        await message.answer("Error: freelancer not found.")
         return
 
-    text = "📋 <b>Your orders:</b>\n\nSelect an order to view:"
-    keyboard = create_employee_orders_keyboard(orders)
-    await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+    text, keyboard = await render_employee_orders(employee.id, "pending")
+    return message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+
+
+@employee_handlers_router.callback_query(F.data.startswith("emp_orders:"))
+async def paginate_employee_orders(callback: CallbackQuery, employee: Employee | None):
+    # RoleFilter also lets through users who are still signing up, before the row exists
+    if not employee:
+        await callback.answer("Error: freelancer not found.", show_alert=True)
+        return
+    try:
+        tab, cursor = parse_orders_callback(callback.data)
+    except ValueError:
+        await callback.answer("This list is outdated, open it again", show_alert=True)
+        return
+
+    await callback.answer()
+    text, keyboard = await render_employee_orders(employee.id, tab, before=cursor)
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    except TelegramBadRequest:
+        pass
 
 
 @employee_handlers_router.callback_query(F.data.startswith("emp_order_view:"))
@@ -71,13 +93,12 @@ async def view_employee_order(callback: CallbackQuery):
     order_id = int(callback.data.split(":")[1])
 
     async with Local_Session() as session:
-        order = await get_order_by_id(session, order_id)
+        order = await get_order_with_details(session, order_id)
         if not order:
             await callback.message.answer("Order not found.")
             return
         
-        client = await get_client_by_id(session, order.client_id)
-        order_text = format_order_info(order, client)
+        order_text = format_order_info(order, order.client)
         
         if order.status == OrderStatusEnum.PENDING:
             keyboard = create_order_action_keyboard(order_id)
@@ -87,132 +108,162 @@ async def view_employee_order(callback: CallbackQuery):
 
 
 @employee_handlers_router.callback_query(F.data.startswith("order_approve:"))
-async def approve_order(callback: CallbackQuery):
-    await callback.answer()
+async def approve_order(callback: CallbackQuery, employee: Employee | None):
+    if not employee:
+        await callback.answer("Error: freelancer not found.", show_alert=True)
+        return
     order_id = int(callback.data.split(":")[1])
 
     async with Local_Session() as session:
-        order = await get_order_by_id(session, order_id)
+        order = await transition_order_status(
+            session, order_id, OrderStatusEnum.PENDING, OrderStatusEnum.IN_PROGRESS, employee_id=employee.id
+        )
         if not order:
-            await callback.message.answer("Order not found.")
+            await callback.answer("This order has already been processed.", show_alert=True)
             return
 
-        if order.status != OrderStatusEnum.PENDING:
+        client = await session.get(Client, order.client_id)
+        await enqueue_message(
+            session,
+            client.telegram_user_id,
+            f"✅ <b>Your order #{order_id} was accepted!</b>\n\n"
+            f"{html.quote(employee.first_name)} {html.quote(employee.last_name)} has started working on it."
+        )
+        await session.commit()
+
+    await callback.answer()
+    order_text = format_order_info(order, client)
+    await callback.message.edit_text(
+        f"✅ <b>Order confirmed!</b>\n\n{order_text}",
+        parse_mode="HTML"
+    )
+
+
+@employee_handlers_router.callback_query(F.data.startswith("order_cancel_emp:"))
+async def cancel_order_by_employee(callback: CallbackQuery, employee: Employee | None):
+    if not employee:
+        await callback.answer("Error: freelancer not found.", show_alert=True)
+        return
+    order_id = int(callback.data.split(":")[1])
+
+    async with Local_Session() as session:
+        order = await transition_order_status(
+            session, order_id, OrderStatusEnum.PENDING, OrderStatusEnum.CANCELLED, employee_id=employee.id
+        )
+        if not order:
             await callback.answer("This order has already been processed.", show_alert=True)
             return
-        
-        updated_order = await update_order_status(session, order_id, OrderStatusEnum.IN_PROGRESS)
-        if updated_order:
-            client = await get_client_by_id(session, updated_order.client_id)
-            order_text = format_order_info(updated_order, client)
-            await callback.message.edit_text(
-                f"✅ <b>Order confirmed!</b>\n\n{order_text}",
-                parse_mode="HTML"
-            )
-        else:
-            await callback.message.answer("Error updating order status.")
 
+        client = await session.get(Client, order.client_id)
+        await enqueue_message(
+            session,
+            client.telegram_user_id,
+            f"❌ <b>Your order #{order_id} was declined.</b>\n\n"
+            f"{html.quote(employee.first_name)} {html.quote(employee.last_name)} can't take it right now."
+        )
+        await session.commit()
 
-@employee_handlers_router.callback_query(F.data.startswith("order_cancel_emp:"))
-async def cancel_order_by_employee(callback: CallbackQuery):
     await callback.answer()
+    order_text = format_order_info(order, client)
+    await callback.message.edit_text(
+        f"❌ <b>Order cancelled</b>\n\n{order_text}",
+        parse_mode="HTML"
+    )
+
+
+@employee_handlers_router.callback_query(F.data.startswith("open_claim:"))
+async def claim_order(callback: CallbackQuery, employee: Employee | None):
+    if not employee:
+        await callback.answer("Error: freelancer not found.", show_alert=True)
+        return
+
     order_id = int(callback.data.split(":")[1])
-    
+
     async with Local_Session() as session:
-        order = await get_order_by_id(session, order_id)
+        order = await claim_open_order(session, order_id, employee.id, employee.branch)
         if not order:
-            await callback.message.answer("Order not found.")
+            await callback.answer("Someone has already taken this order.", show_alert=True)
             return
 
-        if order.status != OrderStatusEnum.PENDING:
-            await callback.answer("This order has already been processed.", show_alert=True)
-            return
-        
-        updated_order = await update_order_status(session, order_id, OrderStatusEnum.CANCELLED)
-        if updated_order:
-            client = await get_client_by_id(session, updated_order.client_id)
-            order_text = format_order_info(updated_order, client)
-            await callback.message.edit_text(
-                f"❌ <b>Order cancelled</b>\n\n{order_text}",
-                parse_mode="HTML"
-            )
-        else:
-            await callback.message.answer("Error updating order status.")
+        # Offers not yet sent would only lead to "already taken"
+        await cancel_order_messages(session, order_id)
+        client = await session.get(Client, order.client_id)
+        await enqueue_message(
+            session,
+            client.telegram_user_id,
+            f"✅ <b>Your order #{order_id} was taken!</b>\n\n"
+            f"{html.quote(employee.first_name)} {html.quote(employee.last_name)} has started working on it."
+        )
+        await session.commit()
+
+    await callback.answer()
+    order_text = format_order_info(order, client)
+    await callback.message.edit_text(
+        f"✅ <b>The order is yours!</b>\n\n{order_text}",
+        parse_mode="HTML"
+    )
 
 
 @employee_handlers_router.message(F.text == "👤 Profile")
-async def show_employee_profile(message: Message):
-    user_id = message.from_user.id
+async def show_employee_profile(message: Message, employee: Employee | None):
+    if not employee:
+        await message.answer("Error: freelancer not found.")
+        return
 
     async with Local_Session() as session:
-        employee = await get_employee(session, user_id)
-        if not employee:
-            await message.answer("Error: freelancer not found.")
-            return
-        
-        reviews = await get_reviews_by_employee(session, employee.id)
-        
-        text = (
-            f"👤 <b>Your profile:</b>\n\n"
-            f"📛 <b>Name:</b> {employee.first_name} {employee.last_name}\n"
-            f"📞 <b>Phone:</b> {employee.phone}\n"
-            f"🎂 <b>Date of birth:</b> {employee.birth_date}\n"
-            f"💼 <b>Direction:</b> {employee.branch.value}\n"
-            f"⭐ <b>Rating:</b> {employee.rating}\n"
-            f"📊 <b>Reviews:</b> {employee.total_reviews}\n"
-            f"📅 <b>Registration date:</b> {employee.created_at.strftime('%d.%m.%Y')}"
-        )
+        reviews, has_more = await get_reviews_page(session, employee.id, limit=PROFILE_REVIEWS_LIMIT)
         
-        if reviews:
-            text += "\n\n📝 <b>Latest reviews:</b>\n"
-            for review in reviews[:5]:
-                stars = "⭐" * review.rating
-                text += f"\n{stars} ({review.rating}/5)\n"
-                if review.comment:
-                    text += f"{review.comment}\n"
-                text += f"📅 {review.created_at.strftime('%d.%m.%Y')}\n"
-        else:
-            text += "\n\n📝 No reviews yet."
+    text = (
+        f"👤 <b>Your profile:</b>\n\n"
+        f"📛 <b>Name:</b> {employee.first_name} {employee.last_name}\n"
+        f"📞 <b>Phone:</b> {employee.phone}\n"
+        f"🎂 <b>Date of birth:</b> {employee.birth_date}\n"
+        f"💼 <b>Direction:</b> {employee.branch.value}\n"
+        f"⭐ <b>Rating:</b> {employee.rating}\n"
+        f"📊 <b>Reviews:</b> {employee.total_reviews}\n"
+        f"📅 <b>Registration date:</b> {employee.created_at.strftime('%d.%m.%Y')}"
+    )
     
-    await message.answer(text, parse_mode="HTML")
+    if reviews:
+        text += "\n\n📝 <b>Latest reviews:</b>\n" + format_reviews(reviews)
+    else:
+        text += "\n\n📝 No reviews yet."
+    
+    keyboard = create_reviews_keyboard(employee.id, reviews, has_older=has_more)
+    return message.answer(text, reply_markup=keyboard, parse_mode="HTML")
 
 
 @employee_handlers_router.message(F.text == "📊 Statistics")
-async def show_employee_statistics(message: Message):
-    user_id = message.from_user.id
-    
+async def show_employee_statistics(message: Message, employee: Employee | None):
+    if not employee:
+        await message.answer("Error: freelancer not found.")
+        return
+
     async with Local_Session() as session:
-        employee = await get_employee(session, user_id)
-        if not employee:
-            await message.answer("Error: freelancer not found.")
-            return
-        
-        all_orders = await get_orders_by_employee(session, employee.id)
-        pending_orders = await get_orders_by_employee(session, employee.id, OrderStatusEnum.PENDING)
-        in_progress_orders = await get_orders_by_employee(session, employee.id, OrderStatusEnum.IN_PROGRESS)
-        completed_orders = await get_orders_by_employee(session, employee.id, OrderStatusEnum.COMPLETED)
-        cancelled_orders = await get_orders_by_employee(session, employee.id, OrderStatusEnum.CANCELLED)
-        
-        total_orders = len(all_orders)
-        pending_count = len(pending_orders)
-        in_progress_count = len(in_progress_orders)
-        completed_count = len(completed_orders)
-        cancelled_count = len(cancelled_orders)
-        
-        total_earned = sum(float(order.price) for order in completed_orders)
-        
+        stats = await get_employee_order_stats(session, employee.id)
+
         text = (
             f"📊 <b>Your statistics:</b>\n\n"
-            f"📋 <b>Total orders:</b> {total_orders}\n\n"
+            f"📋 <b>Total orders:</b> {stats.total}\n\n"
             f"📊 <b>By status:</b>\n"
-            f"⏳ Waiting for confirmation: {pending_count}\n"
-            f"✅ In progress: {in_progress_count}\n"
-            f"✅ Completed: {completed_count}\n"
-            f"❌ Cancelled: {cancelled_count}\n\n"
-            f"💰 <b>Earned:</b> {total_earned:.2f} USD\n"
+            f"⏳ Waiting for confirmation: {stats.count(OrderStatusEnum.PENDING)}\n"
+            f"✅ In progress: {stats.count(OrderStatusEnum.IN_PROGRESS)}\n"
+            f"✅ Completed: {stats.count(OrderStatusEnum.COMPLETED)}\n"
+            f"❌ Cancelled: {stats.count(OrderStatusEnum.CANCELLED)}\n\n"
+            f"💰 <b>Earned:</b> {stats.completed_revenue:.2f} USD\n"
             f"⭐ <b>Rating:</b> {employee.rating}\n"
             f"📝 <b>Reviews:</b> {employee.total_reviews}"
         )
     
-    await message.answer(text, parse_mode="HTML")
+    return message.answer(text, parse_mode="HTML")
+
+
+@employee_handlers_router.message(F.text == "📤 Export")
+async def export_orders(message: Message, bot: Bot, employee: Employee | None):
+    if not employee:
+        await message.answer("Error: freelancer not found.")
+        return
 
+    if not start_orders_export(bot, message.chat.id, employee.id):
+        return message.answer("Your report is already being prepared.")
+    return message.answer("⏳ Preparing your orders report, it will arrive here shortly.")
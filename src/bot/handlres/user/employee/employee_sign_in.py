@@ -2,6 +2,7 @@ from aiogram import F, Router
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardRemove
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
+from aiogram.utils.text_decorations import html_decoration as html
 
 from src.bot.kbd.user_keyboard import contact_kbd, kb, client_emp_kbd, brunch_markup
 from src.bot.filters.user.role_filter import RoleFilter
@@ -24,6 +25,7 @@ class SignUpEmployee(StatesGroup):
     phone = State()
     birth_date = State()
     branch = State()
+    skills = State()
     confirm = State()
 
 
@@ -86,7 +88,8 @@ async def emp_birth_date(message: Message, state: FSMContext):
         await message.answer("Invalid date format. Try again (YYYY-MM-DD or DD.MM.YYYY).")
         return
 
-    await state.update_data(birth_date=bd)
+    # FSM data must stay JSON-serializable for persistent storages
+    await state.update_data(birth_date=bd.isoformat())
 
 
     await message.answer("Choose direction/specialization:", reply_markup=brunch_markup)
@@ -99,15 +102,30 @@ async def emp_choose_branch(call: CallbackQuery, state: FSMContext):
     branch_value = call.data.split(":", 1)[1]
     await state.update_data(branch=branch_value)
 
+    await call.message.answer("List your skills, comma separated (e.g. python, django, sql), or send - to skip:")
+    await state.set_state(SignUpEmployee.skills)
+
+
+@employee_sign_in_router.message(SignUpEmployee.skills)
+async def emp_skills(message: Message, state: FSMContext):
+    if not message.text:
+        await message.answer("Please list your skills in text, or send - to skip.")
+        return
+    txt = message.text.strip()
+    skills = None if txt == "-" else txt[:500]
+    await state.update_data(skills=skills)
+
     data = await state.get_data()
+    # All of it is user input
     summary = (f"Please confirm the data:\n"
-               f"First name: {data.get('first_name')}\n"
-               f"Last name: {data.get('last_name')}\n"
-               f"Phone: {data.get('phone')}\n"
-               f"Date of birth: {data.get('birth_date')}\n"
-               f"Direction: {branch_value}")
-
-    await call.message.answer(summary, reply_markup=kb)
+               f"First name: {html.quote(str(data.get('first_name')))}\n"
+               f"Last name: {html.quote(str(data.get('last_name')))}\n"
+               f"Phone: {html.quote(str(data.get('phone')))}\n"
+               f"Date of birth: {html.quote(str(data.get('birth_date')))}\n"
+               f"Direction: {html.quote(str(data.get('branch')))}\n"
+               f"Skills: {html.quote(skills or '-')}")
+
+    await message.answer(summary, reply_markup=kb, parse_mode="HTML")
     await state.set_state(SignUpEmployee.confirm)
 
 
@@ -129,8 +147,9 @@ async def emp_confirm_yes(call: CallbackQuery, state: FSMContext):
             first_name=data.get('first_name'),
             last_name=data.get('last_name'),
             phone=data.get('phone'),
-            birth_date=data.get('birth_date'),
+            birth_date=datetime.date.fromisoformat(data.get('birth_date')),
             branch=branch,
+            skills=data.get('skills'),
         )
 
     await call.message.answer("Freelancer registration successful ✅")
@@ -1,33 +1,44 @@
 from aiogram import Router, F
-from aiogram.types import Message, ReplyKeyboardRemove
+from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
 
+from src.db.models.client import Client
+from src.db.models.employee import Employee
 from src.db.session import Local_Session
-from src.db.crud.client import get_client
-from src.db.crud.employee import get_employee
-from src.bot.kbd.user_keyboard import client_emp_kbd, clients_buttons, employee_main_btn
+from src.db.crud.review import get_reviews_page
+from src.bot.kbd.user_keyboard import client_emp_kbd, clients_buttons, employee_main_btn, create_reviews_keyboard, CURSOR_TIME_FORMAT
+
+import datetime
 
 
 user_router = Router()
 
-@user_router.message(CommandStart())
-async def start_cmd(message: Message):
-    user_id = message.from_user.id
-    
-    async with Local_Session() as session:
-        client = await get_client(session=session, telegram_user_id=user_id)
-        employee = await get_employee(session=session, telegram_user_id=user_id)
+REVIEWS_PER_PAGE = 5
+
 
+def format_reviews(reviews) -> str:
+    text = ""
+    for review in reviews:
+        stars = "⭐" * review.rating
+        text += f"\n{stars} ({review.rating}/5)\n"
+        if review.comment:
+            text += f"{review.comment}\n"
+        text += f"📅 {review.created_at.strftime('%d.%m.%Y')}\n"
+    return text
+
+
+@user_router.message(CommandStart())
+async def start_cmd(message: Message, client: Client | None, employee: Employee | None):
     if client or employee:
         if client:
-            await message.answer(f"Hello <b>client</b> {message.from_user.full_name}. Choose one of the following buttons",
-                                 reply_markup=clients_buttons, parse_mode="HTML")
+            return message.answer(f"Hello <b>client</b> {message.from_user.full_name}. Choose one of the following buttons",
+                                  reply_markup=clients_buttons, parse_mode="HTML")
         elif employee:
-            await message.answer(f"Hello <b>freelancer</b> {message.from_user.full_name}. Choose one of the following buttons",
-                                 reply_markup=employee_main_btn, parse_mode="HTML")
+            return message.answer(f"Hello <b>freelancer</b> {message.from_user.full_name}. Choose one of the following buttons",
+                                  reply_markup=employee_main_btn, parse_mode="HTML")
     else:
-        await message.answer("Welcome. Please complete the registration", reply_markup=client_emp_kbd)
+        return message.answer("Welcome. Please complete the registration", reply_markup=client_emp_kbd)
         
 
 @user_router.message(F.text=="I am a client 👨🏻‍💼")
@@ -43,4 +54,37 @@ async def employee_cmd(message: Message, state: FSMContext):
     await state.update_data(role="employee")
     await message.answer("Enter your first name:", reply_markup=ReplyKeyboardRemove())
     from src.bot.handlres.user.employee.employee_sign_in import SignUpEmployee
-    await state.set_state(SignUpEmployee.first_name)
\ No newline at end of file
+    await state.set_state(SignUpEmployee.first_name)
+
+
+@user_router.callback_query(F.data.startswith("reviews:"))
+async def show_reviews_page(callback: CallbackQuery):
+    try:
+        _, employee_id, direction, created_at, review_id = callback.data.split(":")
+        if direction not in ("o", "n"):
+            raise ValueError(f"Unknown direction {direction}")
+        cursor = (datetime.datetime.strptime(created_at, CURSOR_TIME_FORMAT), int(review_id))
+        employee_id = int(employee_id)
+    except ValueError:
+        await callback.answer("This list is outdated, open it again", show_alert=True)
+        return
+
+    async with Local_Session() as session:
+        if direction == "n":
+            reviews, has_more = await get_reviews_page(session, employee_id, limit=REVIEWS_PER_PAGE, after=cursor)
+        else:
+            reviews, has_more = await get_reviews_page(session, employee_id, limit=REVIEWS_PER_PAGE, before=cursor)
+
+    if not reviews:
+        await callback.answer("No older reviews." if direction == "o" else "No newer reviews.", show_alert=True)
+        return
+
+    await callback.answer()
+    # We came from the page on the other side of the cursor, so it exists
+    keyboard = create_reviews_keyboard(
+        employee_id,
+        reviews,
+        has_older=has_more if direction == "o" else True,
+        has_newer=has_more if direction == "n" else True,
+    )
+    await callback.message.edit_text("📝 <b>Reviews:</b>\n" + format_reviews(reviews), reply_markup=keyboard, parse_mode="HTML")
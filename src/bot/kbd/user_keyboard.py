@@ -1,5 +1,10 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup
-from src.db.enums import BranchEnum
+from src.db.enums import BranchEnum, OrderStatusEnum
+
+import datetime
+
+# Timestamps inside keyset cursors in callback data (64 bytes max)
+CURSOR_TIME_FORMAT = "%Y%m%d%H%M%S%f"
 
 client_kbd = KeyboardButton(text="I am a client 👨🏻‍💼")
 emp_kbd = KeyboardButton(text="I am a freelancer 👨🏻‍💻")
@@ -25,16 +30,22 @@ brunch_buttons = [[InlineKeyboardButton(text=b.value, callback_data=f"branch:{b.
 brunch_markup = InlineKeyboardMarkup(inline_keyboard=brunch_buttons)
 
 clients_buttons = ReplyKeyboardMarkup(
-    keyboard=[[KeyboardButton(text="🔍 Find freelancer"), KeyboardButton(text="📋 My orders")],
-              [KeyboardButton(text="👤 Profile")]],
+    keyboard=[[KeyboardButton(text="🔍 Find freelancer"), KeyboardButton(text="🔎 Search")],
+              [KeyboardButton(text="📋 My orders"), KeyboardButton(text="👤 Profile")]],
     resize_keyboard=True
 )
 
 
 EMPLOYEES_PER_PAGE = 5
 
-def create_employees_keyboard(employees: list, page: int = 0, total_count: int = 0) -> InlineKeyboardMarkup:
-    keyboard = []
+
+def employees_page_callback(branch: str, direction: str, page: int, employee) -> str:
+    # direction "n" loads the rows after the cursor employee, "p" the rows before it
+    return f"emp_page:{branch}:{direction}:{page}:{employee.rating}:{employee.id}"
+
+
+def create_employees_keyboard(employees: list, branch: str, page: int = 0, has_prev: bool = False, has_next: bool = False) -> InlineKeyboardMarkup:
+    keyboard = [[InlineKeyboardButton(text="📢 Offer to everyone in this direction", callback_data=f"open_order:{branch}")]]
     
     for employee in employees:
         keyboard.append([
@@ -43,23 +54,30 @@ def create_employees_keyboard(employees: list, page: int = 0, total_count: int =
         ])
     
     pagination_buttons = []
-    total_pages = (total_count + EMPLOYEES_PER_PAGE - 1) // EMPLOYEES_PER_PAGE if total_count > 0 else 1
+    if has_prev and employees:
+        pagination_buttons.append(InlineKeyboardButton(text="⬅️ Back", callback_data=employees_page_callback(branch, "p", page - 1, employees[0])))
+    if has_next and employees:
+        pagination_buttons.append(InlineKeyboardButton(text="Forward ➡️", callback_data=employees_page_callback(branch, "n", page + 1, employees[-1])))
     
-    if total_pages > 1:
-        if page > 0:
-            pagination_buttons.append(InlineKeyboardButton(text="⬅️ Back", callback_data=f"emp_page:{page - 1}"))
-        if page < total_pages - 1:
-            pagination_buttons.append(InlineKeyboardButton(text="Forward ➡️", callback_data=f"emp_page:{page + 1}"))
-        
-        if pagination_buttons:
-            keyboard.append(pagination_buttons)
-            keyboard.append([
-                InlineKeyboardButton(text=f"Page {page + 1} of {total_pages}", callback_data="emp_none")
-            ])
+    if pagination_buttons:
+        keyboard.append(pagination_buttons)
+        keyboard.append([
+            InlineKeyboardButton(text=f"Page {page + 1}", callback_data="emp_none")
+        ])
     
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+def create_search_results_keyboard(employees: list) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text=f"✅ {employee.first_name} {employee.last_name}", callback_data=f"emp_select:{employee.id}"),
+            InlineKeyboardButton(text="👤 Profile", callback_data=f"emp_profile:{employee.id}")
+        ]
+        for employee in employees
+    ])
+
+
 order_confirm_kb = InlineKeyboardMarkup(inline_keyboard=[
     [InlineKeyboardButton(text="✅ Confirm", callback_data="order_confirm"),
      InlineKeyboardButton(text="❌ Cancel", callback_data="order_cancel")]
@@ -75,43 +93,65 @@ def create_order_action_keyboard(order_id: int) -> InlineKeyboardMarkup:
     ])
 
 
-def create_employee_orders_keyboard(orders: list) -> InlineKeyboardMarkup:
-    keyboard = []
-    for order in orders:
-        status_emoji = "⏳" if order.status.value == "PENDING" else "✅" if order.status.value == "IN_PROGRESS" else "❌"
-        keyboard.append([
-            InlineKeyboardButton(
-                text=f"{status_emoji} Order #{order.id} - {order.status.value}",
-                callback_data=f"emp_order_view:{order.id}"
-            )
-        ])
-    
-    if not keyboard:
-        return InlineKeyboardMarkup(inline_keyboard=[])
-    
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+def create_open_order_keyboard(order_id: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="✋ Take order", callback_data=f"open_claim:{order_id}")]
+    ])
+
+
+ORDERS_PER_PAGE = 8
 
+ORDER_TABS = {
+    "pending": ("⏳ Pending", (OrderStatusEnum.PENDING,)),
+    "active": ("🔧 In progress", (OrderStatusEnum.IN_PROGRESS,)),
+    "done": ("🏁 Done", (OrderStatusEnum.COMPLETED, OrderStatusEnum.CANCELLED)),
+}
+
+def _create_orders_keyboard(orders: list, list_prefix: str, view_prefix: str, tab: str, has_more: bool) -> InlineKeyboardMarkup:
+    keyboard = [[
+        InlineKeyboardButton(text=f"• {title} •" if key == tab else title, callback_data=f"{list_prefix}:{key}")
+        for key, (title, _) in ORDER_TABS.items()
+    ]]
 
-def create_client_orders_keyboard(orders: list) -> InlineKeyboardMarkup:
-    keyboard = []
     for order in orders:
         status_emoji = "⏳" if order.status.value == "PENDING" else "✅" if order.status.value == "IN_PROGRESS" else "❌"
         keyboard.append([
             InlineKeyboardButton(
                 text=f"{status_emoji} Order #{order.id} - {order.status.value}",
-                callback_data=f"client_order_view:{order.id}"
+                callback_data=f"{view_prefix}:{order.id}"
             )
         ])
-    
-    if not keyboard:
-        return InlineKeyboardMarkup(inline_keyboard=[])
-    
+
+    if has_more and orders:
+        last = orders[-1]
+        cursor = f"{last.created_at.strftime(CURSOR_TIME_FORMAT)}:{last.id}"
+        keyboard.append([InlineKeyboardButton(text="Older ➡️", callback_data=f"{list_prefix}:{tab}:{cursor}")])
+
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+def create_employee_orders_keyboard(orders: list, tab: str = "pending", has_more: bool = False) -> InlineKeyboardMarkup:
+    return _create_orders_keyboard(orders, "emp_orders", "emp_order_view", tab, has_more)
+
+
+def create_client_orders_keyboard(orders: list, tab: str = "pending", has_more: bool = False) -> InlineKeyboardMarkup:
+    return _create_orders_keyboard(orders, "client_orders", "client_order_view", tab, has_more)
+
+
+def parse_orders_callback(data: str) -> tuple[str, tuple | None]:
+    # <prefix>:<tab> or <prefix>:<tab>:<created_at>:<order_id>
+    parts = data.split(":")
+    tab = parts[1]
+    if tab not in ORDER_TABS:
+        raise ValueError(f"Unknown orders tab {tab}")
+    if len(parts) == 4:
+        return tab, (datetime.datetime.strptime(parts[2], CURSOR_TIME_FORMAT), int(parts[3]))
+    return tab, None
+
+
 employee_main_btn = ReplyKeyboardMarkup(
     keyboard=[[KeyboardButton(text="📋 My orders"), KeyboardButton(text="📊 Statistics")],
-              [KeyboardButton(text="👤 Profile")]],
+              [KeyboardButton(text="👤 Profile"), KeyboardButton(text="📤 Export")]],
     resize_keyboard=True
 )
 
@@ -133,4 +173,18 @@ def create_rating_keyboard(order_id: int) -> InlineKeyboardMarkup:
             InlineKeyboardButton(text="⭐⭐⭐⭐", callback_data=f"rating:{order_id}:4"),
             InlineKeyboardButton(text="⭐⭐⭐⭐⭐", callback_data=f"rating:{order_id}:5")
         ]
-    ])
\ No newline at end of file
+    ])
+
+
+def reviews_page_callback(employee_id: int, direction: str, review) -> str:
+    # direction "o" loads the reviews older than the cursor review, "n" the newer ones
+    return f"reviews:{employee_id}:{direction}:{review.created_at.strftime(CURSOR_TIME_FORMAT)}:{review.id}"
+
+
+def create_reviews_keyboard(employee_id: int, reviews: list, has_older: bool, has_newer: bool = False) -> InlineKeyboardMarkup | None:
+    buttons = []
+    if has_older and reviews:
+        buttons.append(InlineKeyboardButton(text="⬅️ Older reviews", callback_data=reviews_page_callback(employee_id, "o", reviews[-1])))
+    if has_newer and reviews:
+        buttons.append(InlineKeyboardButton(text="Newer reviews ➡️", callback_data=reviews_page_callback(employee_id, "n", reviews[0])))
+    return InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
@@ -0,0 +1,128 @@
+from bisect import bisect_left
+from typing import Any, Callable
+from aiohttp import web
+from aiogram.fsm.storage.base import BaseStorage
+
+from src.cache.role_cache import role_cache
+from src.cache.render_cache import render_cache
+from src.cache.search_cache import search_cache
+from src.db.session import pool_stats
+
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 12, 20)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """Histograms sharing a name and buckets, one per label value."""
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...], label: str | None = None):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.label = label
+        self.children: dict[str, Histogram] = {}
+
+    def labels(self, value: str = "") -> Histogram:
+        histogram = self.children.get(value)
+        if histogram is None:
+            histogram = self.children[value] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for value, histogram in sorted(self.children.items()):
+            label = f'{self.label}="{value}",' if self.label else ""
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label}le="{bound}"}} {cumulative}')
+            suffix = f"{{{label.rstrip(',')}}}" if label else ""
+            lines.append(f"{self.name}_sum{suffix} {histogram.sum}")
+            lines.append(f"{self.name}_count{suffix} {histogram.count}")
+        return lines
+
+
+class CounterFamily:
+    def __init__(self, name: str, help: str, label: str):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values: dict[str, int] = {}
+
+    def inc(self, value: str) -> None:
+        self.values[value] = self.values.get(value, 0) + 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f'{self.name}{{{self.label}="{value}"}} {count}' for value, count in sorted(self.values.items())]
+        return lines
+
+
+handler_duration = HistogramFamily("bot_handler_duration_seconds", "Time spent inside a handler.", DURATION_BUCKETS, label="handler")
+handler_errors = CounterFamily("bot_handler_errors_total", "Handlers that raised.", label="handler")
+update_duration = HistogramFamily("bot_update_duration_seconds", "Time to process one update, middlewares included.", DURATION_BUCKETS)
+update_db_queries = HistogramFamily("bot_update_db_queries", "SQL statements executed per update.", QUERY_COUNT_BUCKETS)
+update_db_duration = HistogramFamily("bot_update_db_seconds", "Time spent in SQL statements per update.", DURATION_BUCKETS)
+
+FAMILIES = (handler_duration, handler_errors, update_duration, update_db_queries, update_db_duration)
+
+# name -> callable returning {stat: number}; rendered as gauges named <name>_<stat>
+_gauge_sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_gauges(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    _gauge_sources[name] = source
+
+
+def register_default_gauges(storage: BaseStorage | None) -> None:
+    register_gauges("bot_db_pool", pool_stats)
+    register_gauges("bot_role_cache", role_cache.stats)
+    register_gauges("bot_render_cache", render_cache.stats)
+    register_gauges("bot_search_cache", search_cache.stats)
+    # Only the bounded in-memory storage keeps counters
+    if hasattr(storage, "stats"):
+        register_gauges("bot_fsm_storage", storage.stats)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for family in FAMILIES:
+        lines += family.render()
+    for name, source in _gauge_sources.items():
+        for stat, value in source().items():
+            lines.append(f"# TYPE {name}_{stat} gauge")
+            lines.append(f"{name}_{stat} {float(value)}")
+    return "\n".join(lines) + "\n"
+
+
+async def _metrics_view(request: web.Request) -> web.Response:
+    return web.Response(body=render().encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_view)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+    return runner
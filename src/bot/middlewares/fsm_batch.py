@@ -0,0 +1,21 @@
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from src.bot.fsm.postgres_storage import PostgresStorage
+
+
+class FSMBatchMiddleware(BaseMiddleware):
+    """Coalesces every FSM read/write made while handling one update into a single storage write."""
+
+    def __init__(self, storage: PostgresStorage):
+        self.storage = storage
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self.storage.batch():
+            return await handler(event, data)
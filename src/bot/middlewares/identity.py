@@ -0,0 +1,39 @@
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+from src.db.session import Local_Session
+from src.db.crud.client import get_client
+from src.db.crud.employee import get_employee
+from src.cache.role_cache import role_cache
+
+
+class IdentityMiddleware(BaseMiddleware):
+    """Resolves the caller's Client/Employee rows once per update and exposes them as `client`/`employee`."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        client = employee = None
+        user: User | None = data.get("event_from_user")
+
+        if user:
+            roles = role_cache.get_roles(user.id)
+            # An empty cached role set means an unregistered user, no query needed
+            if roles is None or roles:
+                async with Local_Session() as session:
+                    if roles is None or "client" in roles:
+                        client = await get_client(session=session, telegram_user_id=user.id)
+                    if roles is None or "employee" in roles:
+                        employee = await get_employee(session=session, telegram_user_id=user.id)
+
+            if roles is None:
+                roles = frozenset(role for role, row in (("client", client), ("employee", employee)) if row is not None)
+                role_cache.set_roles(user.id, roles)
+
+        data["client"] = client
+        data["employee"] = employee
+        return await handler(event, data)
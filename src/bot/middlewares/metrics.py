@@ -0,0 +1,48 @@
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+import time
+
+from src.bot import metrics
+from src.db.query_stats import QueryStats, activate_query_stats, current_query_stats
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outermost update middleware: total latency plus SQL statements and DB time per update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        stats = QueryStats()
+        token = activate_query_stats(stats)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            metrics.update_duration.observe(time.perf_counter() - start)
+            current_query_stats.reset(token)
+            metrics.update_db_queries.observe(stats.count)
+            metrics.update_db_duration.observe(stats.seconds)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: times the matched handler, labelled by its function name."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        name = data["handler"].callback.__name__
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            metrics.handler_errors.inc(name)
+            raise
+        finally:
+            metrics.handler_duration.labels(name).observe(time.perf_counter() - start)
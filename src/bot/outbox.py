@@ -0,0 +1,146 @@
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError, TelegramBadRequest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+import asyncio
+import logging
+import random
+import time
+
+from src.bot.config import bot_settings
+from src.db.crud.outbox import claim_due_messages, mark_sent, reschedule_message, mark_failed
+from src.db.models.outbox import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        # The lock queues waiters in FIFO order so nobody starves
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so no token is handed out for `seconds` (used on flood-control 429s)."""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class OutboxSender:
+    """Delivers outbox rows with a global rate limit, per-chat pacing and retry with backoff.
+
+    Run one per deployment (or several: claims use SKIP LOCKED, but each one has its own rate budget).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        session_maker: async_sessionmaker,
+        rate: float = bot_settings.OUTBOX_RATE,
+        chat_interval: float = bot_settings.OUTBOX_CHAT_INTERVAL,
+        batch_size: int = bot_settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = bot_settings.OUTBOX_POLL_INTERVAL,
+        max_attempts: int = bot_settings.OUTBOX_MAX_ATTEMPTS,
+        backoff_base: float = 2.0,
+        backoff_max: float = 600.0,
+    ):
+        self.bot = bot
+        self.session_maker = session_maker
+        self.bucket = TokenBucket(rate)
+        self.chat_interval = chat_interval
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._chat_next: dict[int, float] = {}
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _wait_for_chat(self, chat_id: int) -> None:
+        # Reserve the slot before sleeping so concurrent messages to one chat queue up behind each other
+        now = time.monotonic()
+        slot = max(now, self._chat_next.get(chat_id, 0.0))
+        self._chat_next[chat_id] = slot + self.chat_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _send(self, message: OutboxMessage) -> tuple[str, float, str]:
+        """Returns ("sent" | "retry" | "failed", retry delay, error)."""
+        await self._wait_for_chat(message.chat_id)
+        await self.bucket.acquire()
+        try:
+            reply_markup = InlineKeyboardMarkup.model_validate(message.reply_markup) if message.reply_markup else None
+            await self.bot.send_message(message.chat_id, message.body, parse_mode=message.parse_mode, reply_markup=reply_markup)
+        except TelegramRetryAfter as e:
+            # Flood control applies to the whole bot, so every pending send waits it out
+            self.bucket.pause(e.retry_after)
+            self._chat_next[message.chat_id] = time.monotonic() + e.retry_after
+            return "retry", e.retry_after, str(e)
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # Blocked bot, deleted chat, malformed text: retrying won't help
+            return "failed", 0, str(e)
+        except Exception as e:
+            if message.attempts >= self.max_attempts:
+                return "failed", 0, str(e)
+            return "retry", self._backoff(message.attempts), str(e)
+        return "sent", 0, ""
+
+    def _prune_chats(self) -> None:
+        now = time.monotonic()
+        self._chat_next = {chat_id: t for chat_id, t in self._chat_next.items() if t > now}
+
+    async def run_once(self) -> int:
+        async with self.session_maker() as session:
+            messages = await claim_due_messages(session, self.batch_size)
+        if not messages:
+            return 0
+
+        results = await asyncio.gather(*(self._send(message) for message in messages))
+
+        sent = []
+        async with self.session_maker() as session:
+            for message, (outcome, delay, error) in zip(messages, results):
+                if outcome == "sent":
+                    sent.append(message.id)
+                elif outcome == "retry":
+                    await reschedule_message(session, message.id, delay, error)
+                else:
+                    logger.warning("Giving up on outbox message %s to %s: %s", message.id, message.chat_id, error)
+                    await mark_failed(session, message.id, error)
+            await mark_sent(session, sent)
+            await session.commit()
+        return len(messages)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox sender iteration failed")
+                processed = 0
+            self._prune_chats()
+            # A full batch means there's probably more waiting
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,94 @@
+from typing import AsyncGenerator
+from aiogram import Bot
+from aiogram.types import InputFile
+from tempfile import SpooledTemporaryFile
+import asyncio
+import csv
+import io
+import logging
+
+from src.db.session import Local_Session
+from src.db.crud.order import stream_orders_by_employee
+from src.db.enums import OrderStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Reports stay in memory up to this size, then spill to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+# Long-running cursors hold a pooled connection each, so cap how many run at once
+MAX_CONCURRENT_EXPORTS = 2
+
+_export_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPORTS)
+_running: set[int] = set()
+_tasks: set[asyncio.Task] = set()
+
+
+class SpooledInputFile(InputFile):
+    """Uploads a (spooled) temporary file in chunks instead of reading it into one bytes object."""
+
+    def __init__(self, file, filename: str, **kwargs):
+        super().__init__(filename=filename, **kwargs)
+        self.file = file
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
+
+
+async def write_orders_csv(employee_id: int, file) -> tuple[int, float]:
+    """Writes the freelancer's orders as CSV into a binary file; returns (orders, completed earnings)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["order_id", "created_at", "finished_at", "status", "price", "description"])
+    # BOM so spreadsheet apps detect UTF-8
+    file.write(b"\xef\xbb\xbf")
+
+    count, earnings = 0, 0.0
+    async with Local_Session() as session:
+        async for order in stream_orders_by_employee(session, employee_id):
+            writer.writerow([order.id, order.created_at, order.finished_at or "", order.status.value, order.price, order.description])
+            count += 1
+            if order.status == OrderStatusEnum.COMPLETED:
+                earnings += float(order.price)
+            if buffer.tell() > 64 * 1024:
+                file.write(buffer.getvalue().encode())
+                buffer.seek(0)
+                buffer.truncate()
+    file.write(buffer.getvalue().encode())
+    return count, earnings
+
+
+async def send_orders_report(bot: Bot, chat_id: int, employee_id: int) -> None:
+    try:
+        async with _export_slots:
+            with SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as file:
+                count, earnings = await write_orders_csv(employee_id, file)
+                if not count:
+                    await bot.send_message(chat_id, "You have no orders to export yet.")
+                    return
+                await bot.send_document(
+                    chat_id,
+                    SpooledInputFile(file, filename="orders.csv"),
+                    caption=f"📤 {count} orders, {earnings:.2f} USD earned on completed ones.",
+                )
+    except Exception:
+        logger.exception("Orders export failed for employee %s", employee_id)
+        try:
+            await bot.send_message(chat_id, "Could not build the report, try again later.")
+        except Exception:
+            # Nobody awaits this task, so an escaping error would only surface at garbage collection
+            logger.exception("Could not tell employee %s the export failed", employee_id)
+    finally:
+        _running.discard(employee_id)
+
+
+def start_orders_export(bot: Bot, chat_id: int, employee_id: int) -> bool:
+    """Runs the export in the background; False if this freelancer already has one in progress."""
+    if employee_id in _running:
+        return False
+    _running.add(employee_id)
+    task = asyncio.create_task(send_orders_report(bot, chat_id, employee_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return True
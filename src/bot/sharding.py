@@ -0,0 +1,163 @@
+from typing import Any, Callable
+from queue import Full
+from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.fsm.storage.memory import SimpleEventIsolation
+from aiogram.methods import TelegramMethod
+from aiogram.utils.backoff import Backoff, BackoffConfig
+import asyncio
+import logging
+import multiprocessing
+import zlib
+
+from src.bot.config import bot_settings
+
+logger = logging.getLogger(__name__)
+
+# Same as aiogram's own polling
+POLLING_BACKOFF = BackoffConfig(min_delay=1.0, max_delay=5.0, factor=1.3, jitter=0.1)
+
+
+def update_user_id(update: dict[str, Any]) -> int | None:
+    for value in update.values():
+        if isinstance(value, dict):
+            user = value.get("from") or value.get("user")
+            if isinstance(user, dict) and "id" in user:
+                return user["id"]
+    return None
+
+
+def shard_for(update: dict[str, Any], workers: int) -> int:
+    user_id = update_user_id(update)
+    if user_id is None:
+        return update.get("update_id", 0) % workers
+    # crc32 keeps the mapping stable across processes, unlike the salted hash()
+    return zlib.crc32(str(user_id).encode()) % workers
+
+
+def default_bot_factory() -> Bot:
+    return Bot(token=bot_settings.BOT_TOKEN)
+
+
+async def _feed(dp: Dispatcher, bot: Bot, raw: dict[str, Any], ack_queue) -> None:
+    try:
+        result = await dp.feed_raw_update(bot, raw)
+        if isinstance(result, TelegramMethod):
+            await dp.silent_call_request(bot, result)
+    except Exception:
+        logger.exception("Failed to process update %s", raw.get("update_id"))
+    finally:
+        if ack_queue is not None:
+            ack_queue.put(raw.get("update_id"))
+
+
+async def _worker_loop(queue, ack_queue, bot_factory: Callable[[], Bot], index: int) -> None:
+    # Imported here so every spawned worker builds its own routers, engine and DB pool
+    from src.bot.dispatcher import create_dispatcher
+    from src.bot.metrics import start_metrics_server, register_default_gauges
+
+    bot = bot_factory()
+    # Per-user locks in arrival order keep each user's updates sequential inside the worker
+    dp = create_dispatcher(events_isolation=SimpleEventIsolation())
+    metrics_runner = None
+    if bot_settings.METRICS_PORT:
+        register_default_gauges(dp.storage)
+        metrics_runner = await start_metrics_server(bot_settings.METRICS_HOST, bot_settings.METRICS_PORT + index + 1)
+    loop = asyncio.get_running_loop()
+    tasks: set[asyncio.Task] = set()
+
+    while True:
+        raw = await loop.run_in_executor(None, queue.get)
+        if raw is None:
+            break
+        task = asyncio.create_task(_feed(dp, bot, raw, ack_queue))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if metrics_runner:
+        await metrics_runner.cleanup()
+    await dp.storage.close()
+    await bot.session.close()
+
+
+def worker_main(queue, ack_queue=None, bot_factory: Callable[[], Bot] = default_bot_factory, index: int = 0) -> None:
+    asyncio.run(_worker_loop(queue, ack_queue, bot_factory, index))
+
+
+class ShardedWorkers:
+    """Runs N worker processes, each with its own dispatcher and DB pool.
+
+    Updates are routed by from_user.id, so a user's FSM state and update order stay on one worker.
+    Each worker's queue holds at most `queue_size` updates; a full one holds up submitting.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        bot_factory: Callable[[], Bot] = default_bot_factory,
+        ack_queue=None,
+        queue_size: int = bot_settings.WORKER_QUEUE_SIZE,
+    ):
+        self.context = multiprocessing.get_context("spawn")
+        self.queues = [self.context.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.processes = [
+            self.context.Process(target=worker_main, args=(queue, ack_queue, bot_factory, i), name=f"bot-worker-{i}")
+            for i, queue in enumerate(self.queues)
+        ]
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+
+    def submit(self, raw: dict[str, Any]) -> None:
+        self.queues[shard_for(raw, len(self.queues))].put(raw)
+
+    async def asubmit(self, raw: dict[str, Any]) -> None:
+        queue = self.queues[shard_for(raw, len(self.queues))]
+        try:
+            queue.put_nowait(raw)
+        except Full:
+            # Waits in a thread so the event loop (outbox, archiver) keeps running meanwhile
+            await asyncio.to_thread(queue.put, raw)
+
+    def stop(self, timeout: float | None = 30) -> None:
+        for queue in self.queues:
+            try:
+                queue.put(None, timeout=timeout)
+            except Full:
+                pass  # a stuck worker; terminated below
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+
+async def run_sharded_polling(bot: Bot, allowed_updates: list[str], workers: int) -> None:
+    pool = ShardedWorkers(workers)
+    pool.start()
+
+    backoff = Backoff(POLLING_BACKOFF)
+    offset = None
+    try:
+        # Updates queued while the bot was down are processed, not dropped
+        await bot.delete_webhook(drop_pending_updates=False)
+        while True:
+            try:
+                updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+            except TelegramRetryAfter as e:
+                logger.warning("Flood control on getUpdates, retrying in %s s", e.retry_after)
+                await asyncio.sleep(e.retry_after)
+                continue
+            except Exception as e:
+                # Network errors and Bot API outages must not take the workers down with the poller
+                logger.error("Failed to fetch updates - %s: %s", type(e).__name__, e)
+                await backoff.asleep()
+                continue
+            backoff.reset()
+
+            for update in updates:
+                await pool.asubmit(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+                offset = update.update_id + 1
+    finally:
+        pool.stop()
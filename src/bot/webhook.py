@@ -0,0 +1,99 @@
+from typing import Any
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+import asyncio
+import logging
+
+from src.bot.config import bot_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReplyingRequestHandler(SimpleRequestHandler):
+    """Waits up to `reply_timeout` seconds for the handler.
+
+    A handler that finishes in time and returns a Telegram method (e.g. `return message.answer(...)`)
+    gets it sent back as the webhook response, saving a Bot API round-trip. Anything slower
+    continues in the background and Telegram gets an empty 200 right away.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, reply_timeout: float, **kwargs: Any):
+        super().__init__(dispatcher, bot, handle_in_background=reply_timeout <= 0, **kwargs)
+        self.reply_timeout = reply_timeout
+
+    async def _process(self, bot: Bot, update: Update) -> Any:
+        try:
+            return await self.dispatcher.feed_update(bot, update, **self.data)
+        except Exception:
+            logger.exception("Failed to process update %s", update.update_id)
+            raise
+
+    async def _reply_later(self, bot: Bot, task: asyncio.Future) -> None:
+        try:
+            result = await task
+        except Exception:
+            return  # already logged by _process
+        if isinstance(result, TelegramMethod):
+            await self.dispatcher.silent_call_request(bot=bot, result=result)
+
+    async def _handle_request(self, bot: Bot, request: web.Request) -> web.Response:
+        update = Update.model_validate(await request.json(loads=bot.session.json_loads), context={"bot": bot})
+        task = asyncio.ensure_future(self._process(bot, update))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.reply_timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if not done:
+            # Not Dispatcher.feed_webhook_update: it warns on every update that outlives the
+            # reply window, and with a short window that is the normal path
+            background = asyncio.create_task(self._reply_later(bot, task))
+            self._background_feed_update_tasks.add(background)
+            background.add_done_callback(self._background_feed_update_tasks.discard)
+            return web.Response(body=self._build_response_writer(bot=bot, result=None))
+        result = task.result()
+        reply = result if isinstance(result, TelegramMethod) else None
+        return web.Response(body=self._build_response_writer(bot=bot, result=reply))
+
+
+def webhook_secret() -> str:
+    # Without a secret anyone who finds the URL can post updates as any user
+    if not bot_settings.WEBHOOK_SECRET:
+        raise RuntimeError("WEBHOOK_SECRET must be set to run in webhook mode")
+    return bot_settings.WEBHOOK_SECRET
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    app = web.Application()
+    ReplyingRequestHandler(
+        dp,
+        bot,
+        reply_timeout=bot_settings.WEBHOOK_REPLY_TIMEOUT,
+        secret_token=webhook_secret(),
+    ).register(app, path=bot_settings.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    app = create_webhook_app(dp, bot)
+    if bot_settings.WEBHOOK_BASE_URL:
+        await bot.set_webhook(
+            url=bot_settings.WEBHOOK_BASE_URL.rstrip("/") + bot_settings.WEBHOOK_PATH,
+            secret_token=webhook_secret(),
+            allowed_updates=dp.resolve_used_update_types(),
+            # Updates that arrived during a deploy are delivered once the new process is up
+            drop_pending_updates=False,
+        )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=bot_settings.WEBHOOK_HOST, port=bot_settings.WEBHOOK_PORT)
+    await site.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
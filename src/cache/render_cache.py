@@ -0,0 +1,40 @@
+from typing import Any, Hashable
+from src.cache.ttl_cache import TTLCache
+from src.db.enums import BranchEnum
+
+
+class RenderCache(TTLCache):
+    """Rendered views (text, keyboard) keyed by view parameters and the version of the data they show.
+
+    Writers bump a scope's version instead of hunting down every cached page of it; entries of old
+    versions are never hit again and age out through the LRU/TTL. Versions are per process, so the
+    TTL also bounds how stale a view can get when another process made the change.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._versions: dict[Hashable, int] = {}
+
+    def version(self, scope: Hashable) -> int:
+        return self._versions.get(scope, 0)
+
+    def bump(self, *scopes: Hashable) -> None:
+        for scope in scopes:
+            self._versions[scope] = self.version(scope) + 1
+
+    def get_view(self, scope: Hashable, key: Hashable) -> Any:
+        return self.get((scope, self.version(scope), key))
+
+    def set_view(self, scope: Hashable, key: Hashable, view: Any) -> None:
+        self.set((scope, self.version(scope), key), view)
+
+
+def branch_scope(branch: BranchEnum) -> tuple[str, BranchEnum]:
+    return ("branch", branch)
+
+
+def employee_scope(employee_id: int) -> tuple[str, int]:
+    return ("employee", employee_id)
+
+
+render_cache = RenderCache(maxsize=5_000, ttl=120)
@@ -0,0 +1,22 @@
+from src.cache.ttl_cache import TTLCache
+
+
+class RoleCache(TTLCache):
+    """Maps telegram_user_id to the frozenset of registered roles ("client", "employee")."""
+
+    def get_roles(self, telegram_user_id: int) -> frozenset[str] | None:
+        return self.get(telegram_user_id)
+
+    def set_roles(self, telegram_user_id: int, roles: frozenset[str]) -> None:
+        self.set(telegram_user_id, roles)
+
+    def add_role(self, telegram_user_id: int, role: str) -> None:
+        roles = self.peek(telegram_user_id)
+        if roles is None:
+            # Without a cached entry we don't know the other role, let the next lookup resolve it
+            self.invalidate(telegram_user_id)
+            return
+        self.set(telegram_user_id, roles | {role})
+
+
+role_cache = RoleCache(maxsize=50_000, ttl=600)
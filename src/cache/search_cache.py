@@ -0,0 +1,5 @@
+from src.cache.ttl_cache import TTLCache
+
+
+# Normalized query -> result rows; short TTL since new registrations and ratings aren't tracked here
+search_cache = TTLCache(maxsize=2_000, ttl=30)
@@ -0,0 +1,123 @@
+"""Moves finished orders out of the partitioned `orders` table and keeps its partitions in shape.
+
+    python -m src.db.archive           # one pass, e.g. from cron
+    python -m src.db.archive --loop    # every ORDER_ARCHIVE_INTERVAL seconds
+
+Each pass creates the monthly partitions due soon, moves completed/cancelled orders older
+than ORDER_ARCHIVE_AFTER_DAYS to orders_archive in batches of ORDER_ARCHIVE_BATCH_SIZE
+(one short transaction each), then drops old partitions the move left empty, one
+transaction each. A failing step is logged and doesn't keep the others from running.
+"""
+from sqlalchemy.ext.asyncio import async_sessionmaker
+import argparse
+import asyncio
+import datetime
+import logging
+
+from src.db.config import settings
+from src.db.session import engine, Local_Session
+from src.db.crud.order import archive_finished_orders, hot_orders_since
+from src.db.partitions import ensure_order_partitions, find_empty_order_partitions, drop_order_partition_if_empty
+
+logger = logging.getLogger(__name__)
+
+
+class OrderArchiver:
+    """Run one per deployment; a second one is harmless (SKIP LOCKED batches, advisory lock on DDL)."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        batch_size: int = settings.ORDER_ARCHIVE_BATCH_SIZE,
+        interval: float = settings.ORDER_ARCHIVE_INTERVAL,
+        partitions_ahead: int = settings.ORDER_PARTITIONS_AHEAD,
+        batch_pause: float = 0.1,
+    ):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.interval = interval
+        self.partitions_ahead = partitions_ahead
+        # Breathing room between batches for autovacuum, replicas and the bot's own queries
+        self.batch_pause = batch_pause
+
+    async def run_once(self) -> int:
+        cutoff = hot_orders_since()
+        try:
+            await self.ensure_partitions()
+        except Exception:
+            logger.exception("Creating order partitions failed")
+        moved = 0
+        try:
+            moved = await self.archive(cutoff)
+        except Exception:
+            logger.exception("Archiving orders failed")
+        try:
+            await self.drop_partitions(cutoff)
+        except Exception:
+            logger.exception("Dropping emptied order partitions failed")
+        return moved
+
+    async def ensure_partitions(self) -> None:
+        async with self.session_maker() as session:
+            created = await ensure_order_partitions(session, self.partitions_ahead)
+            await session.commit()
+        if created:
+            logger.info("Created order partitions %s", ", ".join(created))
+
+    async def archive(self, cutoff: datetime.datetime) -> int:
+        moved = 0
+        try:
+            while True:
+                async with self.session_maker() as session:
+                    batch = await archive_finished_orders(session, cutoff, self.batch_size)
+                    await session.commit()
+                moved += batch
+                if batch < self.batch_size:
+                    break
+                await asyncio.sleep(self.batch_pause)
+        finally:
+            if moved:
+                logger.info("Archived %s orders created before %s", moved, cutoff)
+        return moved
+
+    async def drop_partitions(self, cutoff: datetime.datetime) -> None:
+        async with self.session_maker() as session:
+            candidates = await find_empty_order_partitions(session, cutoff)
+        dropped = []
+        for name in candidates:
+            # One at a time, so `orders` is never locked for longer than one DROP
+            async with self.session_maker() as session:
+                if await drop_order_partition_if_empty(session, name):
+                    dropped.append(name)
+                await session.commit()
+        if dropped:
+            logger.info("Dropped emptied order partitions %s", ", ".join(dropped))
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order archiver pass failed")
+            await asyncio.sleep(self.interval)
+
+
+async def main(args: argparse.Namespace) -> None:
+    archiver = OrderArchiver(Local_Session, batch_size=args.batch_size)
+    try:
+        if args.loop:
+            await archiver.run()
+        else:
+            await archiver.run_once()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Archive finished orders and maintain order partitions")
+    parser.add_argument("--loop", action="store_true", help="keep running every ORDER_ARCHIVE_INTERVAL seconds")
+    parser.add_argument("--batch-size", type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE)
+    asyncio.run(main(parser.parse_args()))
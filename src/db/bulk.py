@@ -0,0 +1,297 @@
+"""Bulk load and dump of clients, employee, orders and reviews through COPY.
+
+    python -m src.db.bulk import employee partners.csv
+    python -m src.db.bulk import orders orders.jsonl --batch-size 10000
+    python -m src.db.bulk export orders orders.csv
+
+Files are CSV with a header row or JSON lines, picked by extension. Rows are read and
+validated one batch at a time, and every valid batch goes in with one binary COPY.
+Invalid rows, and rows the database refuses when a batch is retried row by row, are
+written to <file>.rejects.jsonl and don't stop the load. An `id` column is kept when
+present, so orders and reviews can reference imported clients and employees. The id
+sequences are moved past it afterwards. Exported orders include the archived ones.
+"""
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Callable, Iterator
+import argparse
+import asyncio
+import csv
+import datetime
+import json
+
+import asyncpg
+
+from src.db.session import engine, Local_Session
+from src.db.enums import BranchEnum, OrderStatusEnum
+from src.db.crud.review import recompute_employee_ratings
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    parse: Callable[[Any], Any]
+    required: bool = True
+
+
+def _int(value: Any) -> int:
+    return int(value)
+
+
+def _str(max_length: int | None = None) -> Callable[[Any], str]:
+    def parse(value: Any) -> str:
+        value = str(value).strip()
+        if max_length and len(value) > max_length:
+            raise ValueError(f"longer than {max_length} characters")
+        return value
+    return parse
+
+
+def _date(value: Any) -> datetime.date:
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(str(value))
+
+
+def _datetime(value: Any) -> datetime.datetime:
+    return value if isinstance(value, datetime.datetime) else datetime.datetime.fromisoformat(str(value))
+
+
+def _decimal(value: Any) -> Decimal:
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"{value!r} is not a number")
+
+
+def _enum(enum_cls) -> Callable[[Any], str]:
+    def parse(value: Any) -> str:
+        # Postgres enum labels are the member names
+        return enum_cls(str(value).strip().upper()).name
+    return parse
+
+
+def _rating(value: Any) -> int:
+    rating = int(value)
+    if not 1 <= rating <= 5:
+        raise ValueError("rating must be 1..5")
+    return rating
+
+
+# Generated and derived columns (search_text, rating, total_reviews, rating_sum) are left to the database
+TABLES: dict[str, tuple[Column, ...]] = {
+    "clients": (
+        Column("id", _int, required=False),
+        Column("telegram_user_id", _int),
+        Column("first_name", _str(100)),
+        Column("last_name", _str(100)),
+        Column("phone", _str(30)),
+        Column("birth_date", _date),
+        Column("created_at", _datetime, required=False),
+    ),
+    "employee": (
+        Column("id", _int, required=False),
+        Column("telegram_user_id", _int),
+        Column("first_name", _str(100)),
+        Column("last_name", _str(100)),
+        Column("phone", _str(30)),
+        Column("birth_date", _date),
+        Column("branch", _enum(BranchEnum)),
+        Column("skills", _str(), required=False),
+        Column("created_at", _datetime, required=False),
+    ),
+    "orders": (
+        Column("id", _int, required=False),
+        Column("client_id", _int),
+        Column("employee_id", _int, required=False),
+        Column("branch", _enum(BranchEnum), required=False),
+        Column("description", _str()),
+        Column("price", _decimal),
+        Column("status", _enum(OrderStatusEnum)),
+        Column("created_at", _datetime, required=False),
+        Column("finished_at", _datetime, required=False),
+    ),
+    "reviews": (
+        Column("id", _int, required=False),
+        Column("client_id", _int),
+        Column("employee_id", _int),
+        Column("order_id", _int),
+        Column("rating", _rating),
+        Column("comment", _str(), required=False),
+        Column("created_at", _datetime, required=False),
+    ),
+}
+
+
+def _assigned_or_open(record: dict[str, Any]) -> None:
+    # An order goes either to a freelancer or, while open, to a whole branch
+    if record.get("employee_id") is None and record.get("branch") is None:
+        raise ValueError("either employee_id or branch is required")
+
+
+# Checks spanning several columns, run on the parsed row
+ROW_CHECKS: dict[str, tuple[Callable[[dict[str, Any]], None], ...]] = {
+    "orders": (_assigned_or_open,),
+}
+
+
+def read_rows(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    """(line number, row) pairs, read lazily."""
+    with path.open(newline="", encoding="utf-8") as file:
+        if path.suffix == ".jsonl":
+            for line_no, line in enumerate(file, 1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            # Line 1 is the header
+            for line_no, row in enumerate(csv.DictReader(file), 2):
+                yield line_no, row
+
+
+def batched(rows: Iterator, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate(columns: tuple[Column, ...], row: dict[str, Any], checks: tuple[Callable[[dict[str, Any]], None], ...] = ()) -> tuple:
+    record = []
+    for column in columns:
+        value = row.get(column.name)
+        if value is None or value == "":
+            if column.required:
+                raise ValueError(f"{column.name} is required")
+            record.append(None)
+            continue
+        try:
+            record.append(column.parse(value))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{column.name}: {e}")
+    parsed = dict(zip((column.name for column in columns), record))
+    for check in checks:
+        check(parsed)
+    return tuple(record)
+
+
+class Rejects:
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def add(self, line_no: int, row: dict[str, Any], error: str) -> None:
+        if self._file is None:
+            self._file = self.path.open("w", encoding="utf-8")
+        self._file.write(json.dumps({"line": line_no, "error": error, "row": row}, default=str, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+
+
+async def _insert_one_by_one(conn: asyncpg.Connection, table: str, names: list[str], batch: list, rejects: Rejects) -> int:
+    # Only after a batch COPY failed: find the offending rows, keep the rest
+    placeholders = ", ".join(f"${i}" for i in range(1, len(names) + 1))
+    sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})"
+    inserted = 0
+    for line_no, row, record in batch:
+        try:
+            await conn.execute(sql, *record)
+            inserted += 1
+        except asyncpg.PostgresError as e:
+            rejects.add(line_no, row, str(e))
+    return inserted
+
+
+async def import_table(table: str, path: Path, batch_size: int) -> None:
+    header_row = next(read_rows(path), (0, {}))[1]
+    columns = tuple(c for c in TABLES[table] if c.required or c.name in header_row)
+    missing = [c.name for c in columns if c.name not in header_row]
+    if missing:
+        raise SystemExit(f"{path}: missing required columns {', '.join(missing)}")
+    names = [c.name for c in columns]
+    checks = ROW_CHECKS.get(table, ())
+
+    rejects = Rejects(path.with_name(path.name + ".rejects.jsonl"))
+    inserted = 0
+    async with engine.connect() as sa_conn:
+        conn: asyncpg.Connection = (await sa_conn.get_raw_connection()).driver_connection
+        for batch in batched(read_rows(path), batch_size):
+            valid = []
+            for line_no, row in batch:
+                try:
+                    valid.append((line_no, row, validate(columns, row, checks)))
+                except ValueError as e:
+                    rejects.add(line_no, row, str(e))
+            if not valid:
+                continue
+            try:
+                async with conn.transaction():
+                    await conn.copy_records_to_table(table, records=[record for _, _, record in valid], columns=names)
+                inserted += len(valid)
+            except asyncpg.PostgresError:
+                inserted += await _insert_one_by_one(conn, table, names, valid, rejects)
+            print(f"\r{table}: {inserted} rows loaded, {rejects.count} rejected", end="", flush=True)
+
+        if "id" in names:
+            # Archived orders hold ids from the same sequence
+            max_id = "GREATEST((SELECT max(id) FROM orders), (SELECT max(id) FROM orders_archive))" if table == "orders" else f"(SELECT max(id) FROM {table})"
+            await conn.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), {max_id})")
+    rejects.close()
+    print(f"\r{table}: {inserted} rows loaded, {rejects.count} rejected" + (f" (see {rejects.path})" if rejects.count else ""))
+
+    if table == "reviews" and inserted:
+        async with Local_Session() as session:
+            fixed = await recompute_employee_ratings(session)
+            await session.commit()
+        print(f"Ratings recomputed for {fixed} employees")
+
+
+# Tables read on export besides the one named; orders_archive has every column of orders
+EXPORT_ALSO = {"orders": ("orders_archive",)}
+
+
+async def export_table(table: str, path: Path, batch_size: int) -> None:
+    names = [c.name for c in TABLES[table]]
+    query = " UNION ALL ".join(
+        f"SELECT {', '.join(names)} FROM {source}" for source in (table, *EXPORT_ALSO.get(table, ()))
+    ) + " ORDER BY id"
+    async with engine.connect() as sa_conn:
+        conn: asyncpg.Connection = (await sa_conn.get_raw_connection()).driver_connection
+        if path.suffix == ".jsonl":
+            exported = 0
+            with path.open("w", encoding="utf-8") as file:
+                async with conn.transaction():
+                    async for record in conn.cursor(query, prefetch=batch_size):
+                        file.write(json.dumps(dict(record), default=str, ensure_ascii=False) + "\n")
+                        exported += 1
+        else:
+            # The server streams CSV straight into the file
+            status = await conn.copy_from_query(query, output=str(path), format="csv", header=True)
+            exported = int(status.split()[-1])
+    print(f"{table}: {exported} rows exported to {path}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    path = Path(args.file)
+    try:
+        if args.command == "import":
+            await import_table(args.table, path, args.batch_size)
+        else:
+            await export_table(args.table, path, args.batch_size)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import/export through COPY")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("table", choices=tuple(TABLES))
+    parser.add_argument("file", help=".csv (with header) or .jsonl")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
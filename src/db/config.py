@@ -6,6 +6,24 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_HOST: str
     DB_PORT: int
+
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Prepared statements cached per connection; ignored when DB_PGBOUNCER is on
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # pgbouncer in transaction mode: no statement caches and uniquely named prepared statements
+    DB_PGBOUNCER: bool = False
+
+    # Finished orders older than this move from the partitioned `orders` to orders_archive
+    ORDER_ARCHIVE_AFTER_DAYS: int = 180
+    ORDER_ARCHIVE_BATCH_SIZE: int = 1000
+    ORDER_ARCHIVE_INTERVAL: float = 3600.0
+    # Monthly partitions created in advance, so inserts never land in the default one
+    ORDER_PARTITIONS_AHEAD: int = 2
     
     
     @property
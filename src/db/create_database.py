@@ -1,17 +1,14 @@
-from src.db.base import Base
-from src.db.session import engine
-import asyncio
+from alembic import command
+from alembic.config import Config
+from pathlib import Path
 
-from src.db.models.employee import Employee
-from src.db.models.client import Client
-from src.db.models.review import Review
-from src.db.models.order import Order
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
 
 
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-        
+def upgrade_database(revision: str = "head") -> None:
+    """Applies pending migrations; never drops anything, safe to run on every deploy."""
+    command.upgrade(Config(str(ALEMBIC_INI)), revision)
 
-asyncio.run(create_tables())
+
+if __name__ == "__main__":
+    upgrade_database()
@@ -1,6 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models.client import Client
+from src.cache.role_cache import role_cache
 
 
 async def get_client(session: AsyncSession, telegram_user_id: int) -> Client | None:
@@ -21,6 +22,7 @@ async def create_client(session: AsyncSession, telegram_user_id: int, first_name
     session.add(client)
     await session.commit()
     await session.refresh(client)
+    role_cache.add_role(telegram_user_id, "client")
     return client
 
 
@@ -1,7 +1,11 @@
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models.employee import Employee
 from src.db.enums import BranchEnum
+from src.cache.role_cache import role_cache
+from src.cache.render_cache import render_cache, branch_scope
+from decimal import Decimal
+from typing import AsyncIterator
 
 
 async def get_employee(session: AsyncSession, telegram_user_id: int) -> Employee | None:
@@ -10,7 +14,7 @@ async def get_employee(session: AsyncSession, telegram_user_id: int) -> Employee
     return res.scalar_one_or_none()
 
 
-async def create_employee(session: AsyncSession, telegram_user_id: int, first_name: str, last_name: str, phone: str, birth_date, branch: BranchEnum) -> Employee:
+async def create_employee(session: AsyncSession, telegram_user_id: int, first_name: str, last_name: str, phone: str, birth_date, branch: BranchEnum, skills: str | None = None) -> Employee:
     employee = Employee(
         telegram_user_id=telegram_user_id,
         first_name=first_name,
@@ -18,26 +22,82 @@ async def create_employee(session: AsyncSession, telegram_user_id: int, first_na
         phone=phone,
         birth_date=birth_date,
         branch=branch,
+        skills=skills,
     )
     session.add(employee)
     await session.commit()
     await session.refresh(employee)
+    role_cache.add_role(telegram_user_id, "employee")
+    render_cache.bump(branch_scope(branch))
     return employee
 
 
+async def iter_branch_chat_ids(session: AsyncSession, branch: BranchEnum, batch_size: int = 500) -> AsyncIterator[list[int]]:
+    """Telegram ids of everyone in `branch`, fetched through a server-side cursor `batch_size` rows at a time."""
+    stmt = (
+        select(Employee.telegram_user_id)
+        .where(Employee.branch == branch)
+        .order_by(Employee.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream_scalars(stmt)
+    async for partition in result.partitions():
+        yield list(partition)
+
+
+async def search_employees(session: AsyncSession, query: str, limit: int = 10) -> list[Employee]:
+    """Freelancers whose name or skills match `query`, best match first, then by rating."""
+    query = query.strip().lower()
+    relevance = func.word_similarity(query, Employee.search_text)
+    stmt = (
+        select(Employee)
+        # Both conditions can use the gin_trgm_ops index on search_text
+        .where(or_(Employee.search_text.contains(query, autoescape=True), Employee.search_text.op("%>")(query)))
+        .order_by(relevance.desc(), Employee.rating.desc(), Employee.id)
+        .limit(limit)
+    )
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
 async def get_all_employees(session: AsyncSession) -> list[Employee]:
     stmt = select(Employee)
     res = await session.execute(stmt)
     return res.scalars().all()
 
 
-async def get_employees_paginated(session: AsyncSession, offset: int = 0, limit: int = 5, branch: BranchEnum | None = None) -> list[Employee]:
+async def get_employees_paginated(
+    session: AsyncSession,
+    branch: BranchEnum | None = None,
+    limit: int = 5,
+    after: tuple[Decimal, int] | None = None,
+    before: tuple[Decimal, int] | None = None,
+) -> tuple[list[Employee], bool]:
+    """Keyset page ordered by (rating DESC, id); returns the page and whether more rows exist past it.
+
+    `after`/`before` are (rating, id) cursors of the last/first row of the neighbouring page.
+    """
     stmt = select(Employee)
     if branch:
         stmt = stmt.where(Employee.branch == branch)
-    stmt = stmt.offset(offset).limit(limit)
-    res = await session.execute(stmt)
-    return res.scalars().all()
+
+    if before:
+        rating, employee_id = before
+        stmt = stmt.where(or_(Employee.rating > rating, and_(Employee.rating == rating, Employee.id < employee_id)))
+        stmt = stmt.order_by(Employee.rating.asc(), Employee.id.desc())
+    else:
+        if after:
+            rating, employee_id = after
+            stmt = stmt.where(or_(Employee.rating < rating, and_(Employee.rating == rating, Employee.id > employee_id)))
+        stmt = stmt.order_by(Employee.rating.desc(), Employee.id.asc())
+
+    res = await session.execute(stmt.limit(limit + 1))
+    employees = list(res.scalars().all())
+    has_more = len(employees) > limit
+    employees = employees[:limit]
+    if before:
+        employees.reverse()
+    return employees, has_more
 
 
 async def get_employees_count(session: AsyncSession, branch: BranchEnum | None = None) -> int:
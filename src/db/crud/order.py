@@ -1,7 +1,27 @@
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, insert, func, tuple_, or_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from src.db.models.order import Order
-from src.db.enums import OrderStatusEnum
+from src.db.models.order_archive import OrderArchive
+from src.db.enums import OrderStatusEnum, BranchEnum
+from src.db.config import settings
+from src.db.partitions import utc_now
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+import datetime
+
+
+@dataclass
+class OrderStats:
+    counts: dict[OrderStatusEnum, int] = field(default_factory=dict)
+    completed_revenue: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def count(self, status: OrderStatusEnum) -> int:
+        return self.counts.get(status, 0)
 
 
 async def create_order(
@@ -23,38 +43,217 @@ async def create_order(
     return order
 
 
+async def create_open_order(
+    session: AsyncSession,
+    client_id: int,
+    branch: BranchEnum,
+    description: str,
+    price: float
+) -> Order:
+    order = Order(
+        client_id=client_id,
+        branch=branch,
+        description=description,
+        price=price,
+        status=OrderStatusEnum.PENDING
+    )
+    session.add(order)
+    await session.flush()
+    return order
+
+
+async def claim_open_order(session: AsyncSession, order_id: int, employee_id: int, branch: BranchEnum) -> Order | None:
+    """First accept wins: a single conditional UPDATE, so losers match no row and write nothing.
+
+    Doesn't commit, like transition_order_status.
+    """
+    stmt = (
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.employee_id.is_(None),
+            Order.status == OrderStatusEnum.PENDING,
+            Order.branch == branch,
+        )
+        .values(employee_id=employee_id, status=OrderStatusEnum.IN_PROGRESS)
+        .returning(Order)
+        .execution_options(populate_existing=True)
+    )
+    res = await session.execute(stmt)
+    return res.scalar_one_or_none()
+
+
 async def get_order_by_id(session: AsyncSession, order_id: int) -> Order | None:
     stmt = select(Order).where(Order.id == order_id)
     res = await session.execute(stmt)
     return res.scalar_one_or_none()
 
 
-async def update_order_status(
+async def get_order_with_details(session: AsyncSession, order_id: int) -> Order | None:
+    # client, employee and review come back in the same round-trip via LEFT OUTER JOINs
+    stmt = (
+        select(Order)
+        .where(Order.id == order_id)
+        .options(joinedload(Order.client), joinedload(Order.employee), joinedload(Order.review))
+    )
+    res = await session.execute(stmt)
+    return res.unique().scalar_one_or_none()
+
+
+TERMINAL_STATUSES = (OrderStatusEnum.COMPLETED, OrderStatusEnum.CANCELLED)
+
+
+async def transition_order_status(
     session: AsyncSession,
     order_id: int,
-    status: OrderStatusEnum
+    expected: OrderStatusEnum,
+    status: OrderStatusEnum,
+    client_id: int | None = None,
+    employee_id: int | None = None,
 ) -> Order | None:
-    order = await get_order_by_id(session, order_id)
-    if not order:
-        return None
-    order.status = status
-    await session.commit()
-    await session.refresh(order)
-    return order
+    """Compare-and-set the status in one UPDATE ... RETURNING; None means the order wasn't in `expected` (lost the race).
+
+    Doesn't commit, so the caller can enqueue notifications in the same transaction.
+    """
+    stmt = update(Order).where(Order.id == order_id, Order.status == expected)
+    if client_id is not None:
+        stmt = stmt.where(Order.client_id == client_id)
+    if employee_id is not None:
+        stmt = stmt.where(Order.employee_id == employee_id)
+
+    values = {"status": status}
+    if status in TERMINAL_STATUSES:
+        values["finished_at"] = func.timezone("utc", func.now())
+
+    stmt = stmt.values(**values).returning(Order).execution_options(populate_existing=True)
+    res = await session.execute(stmt)
+    return res.scalar_one_or_none()
+
+
+def hot_orders_since(now: datetime.datetime | None = None) -> datetime.datetime:
+    """Finished orders created before this are in orders_archive, or about to be moved there."""
+    return (now or utc_now()) - datetime.timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+
+
+def _only_hot(stmt, statuses: tuple[OrderStatusEnum, ...] | None):
+    if statuses and all(status in TERMINAL_STATUSES for status in statuses):
+        # A plain bound on the partition key, so the planner skips the old partitions
+        return stmt.where(Order.created_at >= hot_orders_since())
+    if statuses and not any(status in TERMINAL_STATUSES for status in statuses):
+        return stmt
+    # Open orders are never archived, however old; they're few, and found through the per-partition indexes
+    return stmt.where(or_(Order.status.not_in(TERMINAL_STATUSES), Order.created_at >= hot_orders_since()))
 
 
 async def get_orders_by_employee(session: AsyncSession, employee_id: int, status: OrderStatusEnum | None = None) -> list[Order]:
     stmt = select(Order).where(Order.employee_id == employee_id)
     if status:
         stmt = stmt.where(Order.status == status)
-    res = await session.execute(stmt)
+    res = await session.execute(_only_hot(stmt, (status,) if status else None))
     return list(res.scalars().all())
 
 
+async def stream_orders_by_employee(session: AsyncSession, employee_id: int, batch_size: int = 500) -> AsyncIterator[Order | OrderArchive]:
+    """Archived orders, then live ones, each oldest first.
+
+    Goes through a server-side cursor so only `batch_size` orders are in memory at a time.
+    """
+    for model in (OrderArchive, Order):
+        stmt = (
+            select(model)
+            .where(model.employee_id == employee_id)
+            .order_by(model.created_at, model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream_scalars(stmt)
+        async for order in result:
+            yield order
+
+
 async def get_orders_by_client(session: AsyncSession, client_id: int, status: OrderStatusEnum | None = None) -> list[Order]:
     stmt = select(Order).where(Order.client_id == client_id)
     if status:
         stmt = stmt.where(Order.status == status)
-    res = await session.execute(stmt)
+    res = await session.execute(_only_hot(stmt, (status,) if status else None))
     return list(res.scalars().all())
 
+
+async def get_orders_page(
+    session: AsyncSession,
+    statuses: tuple[OrderStatusEnum, ...],
+    client_id: int | None = None,
+    employee_id: int | None = None,
+    limit: int = 8,
+    before: tuple[datetime.datetime, int] | None = None,
+) -> tuple[list[Order], bool]:
+    """Most recent first page of a client's or employee's orders in the given statuses, plus whether more remain.
+
+    Finished orders older than ORDER_ARCHIVE_AFTER_DAYS aren't listed.
+    """
+    stmt = _only_hot(select(Order).where(Order.status.in_(statuses)), statuses)
+    if client_id is not None:
+        stmt = stmt.where(Order.client_id == client_id)
+    if employee_id is not None:
+        stmt = stmt.where(Order.employee_id == employee_id)
+    if before:
+        stmt = stmt.where(tuple_(Order.created_at, Order.id) < tuple_(*before))
+    stmt = stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+    res = await session.execute(stmt)
+    orders = list(res.scalars().all())
+    return orders[:limit], len(orders) > limit
+
+
+async def _get_order_stats(session: AsyncSession, owner: str, owner_id: int) -> OrderStats:
+    # Lifetime totals, so archived orders count too
+    orders = union_all(*(
+        select(model.status, model.price).where(getattr(model, owner) == owner_id)
+        for model in (Order, OrderArchive)
+    )).subquery()
+    stmt = (
+        select(orders.c.status, func.count(), func.sum(orders.c.price))
+        .group_by(orders.c.status)
+    )
+    res = await session.execute(stmt)
+
+    stats = OrderStats()
+    for status, count, price_sum in res.all():
+        stats.counts[status] = count
+        if status == OrderStatusEnum.COMPLETED:
+            stats.completed_revenue = float(price_sum or 0)
+    return stats
+
+
+async def get_employee_order_stats(session: AsyncSession, employee_id: int) -> OrderStats:
+    return await _get_order_stats(session, "employee_id", employee_id)
+
+
+async def get_client_order_stats(session: AsyncSession, client_id: int) -> OrderStats:
+    return await _get_order_stats(session, "client_id", client_id)
+
+
+ARCHIVED_COLUMNS = ("id", "client_id", "employee_id", "branch", "description", "price", "status", "created_at", "finished_at")
+
+
+async def archive_finished_orders(session: AsyncSession, before: datetime.datetime, limit: int) -> int:
+    """Moves up to `limit` completed/cancelled orders created before `before` into orders_archive.
+
+    One DELETE ... RETURNING feeding an INSERT, so a row is never in both tables or in neither.
+    Rows another transaction has locked are skipped until the next batch. Doesn't commit.
+    """
+    batch = (
+        select(Order.id, Order.created_at)
+        .where(Order.status.in_(TERMINAL_STATUSES), Order.created_at < before)
+        .order_by(Order.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(Order)
+        # The repeated bound lets the DELETE prune partitions as well
+        .where(Order.created_at < before, tuple_(Order.id, Order.created_at).in_(batch))
+        .returning(*(getattr(Order, column) for column in ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    stmt = insert(OrderArchive).from_select(ARCHIVED_COLUMNS, select(*(moved.c[column] for column in ARCHIVED_COLUMNS)))
+    res = await session.execute(stmt)
+    return res.rowcount
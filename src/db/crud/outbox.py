@@ -0,0 +1,111 @@
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.db.models.outbox import OutboxMessage
+from src.db.enums import OutboxStatusEnum
+import datetime
+
+
+def _utc_now():
+    return func.timezone("utc", func.now())
+
+
+async def enqueue_message(
+    session: AsyncSession,
+    chat_id: int,
+    text: str,
+    parse_mode: str | None = "HTML",
+    reply_markup: dict | None = None,
+    order_id: int | None = None,
+) -> OutboxMessage:
+    # No commit: the message is delivered only if the caller's transaction commits
+    message = OutboxMessage(chat_id=chat_id, body=text, parse_mode=parse_mode, reply_markup=reply_markup, order_id=order_id)
+    session.add(message)
+    await session.flush()
+    return message
+
+
+async def enqueue_broadcast(
+    session: AsyncSession,
+    chat_ids: list[int],
+    text: str,
+    parse_mode: str | None = "HTML",
+    reply_markup: dict | None = None,
+    order_id: int | None = None,
+) -> None:
+    """Same message to many chats as one multi-row INSERT, without building ORM objects."""
+    if not chat_ids:
+        return
+    rows = [
+        {"chat_id": chat_id, "body": text, "parse_mode": parse_mode, "reply_markup": reply_markup, "order_id": order_id}
+        for chat_id in chat_ids
+    ]
+    await session.execute(insert(OutboxMessage), rows)
+
+
+async def claim_due_messages(session: AsyncSession, limit: int, lease_seconds: int = 60) -> list[OutboxMessage]:
+    """Lease up to `limit` due messages: they stay PENDING but are hidden from other senders until the lease ends."""
+    due = (
+        select(OutboxMessage.id)
+        .where(OutboxMessage.status == OutboxStatusEnum.PENDING, OutboxMessage.next_attempt_at <= _utc_now())
+        .order_by(OutboxMessage.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(due.scalar_subquery()))
+        .values(
+            attempts=OutboxMessage.attempts + 1,
+            next_attempt_at=_utc_now() + datetime.timedelta(seconds=lease_seconds),
+        )
+        .returning(OutboxMessage)
+        .execution_options(synchronize_session=False)
+    )
+    res = await session.execute(stmt)
+    messages = list(res.scalars().all())
+    await session.commit()
+    return messages
+
+
+async def mark_sent(session: AsyncSession, message_ids: list[int]) -> None:
+    if not message_ids:
+        return
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(message_ids))
+        .values(status=OutboxStatusEnum.SENT, sent_at=_utc_now(), last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+
+async def reschedule_message(session: AsyncSession, message_id: int, delay: float, error: str) -> None:
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.id == message_id)
+        .values(next_attempt_at=_utc_now() + datetime.timedelta(seconds=delay), last_error=error)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+
+async def mark_failed(session: AsyncSession, message_id: int, error: str) -> None:
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.id == message_id)
+        .values(status=OutboxStatusEnum.FAILED, last_error=error)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+
+async def cancel_order_messages(session: AsyncSession, order_id: int) -> int:
+    """Drop offers for an order that are still waiting to be sent; ones already leased go out anyway."""
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.order_id == order_id, OutboxMessage.status == OutboxStatusEnum.PENDING)
+        .values(status=OutboxStatusEnum.CANCELLED)
+        .execution_options(synchronize_session=False)
+    )
+    res = await session.execute(stmt)
+    return res.rowcount
@@ -1,7 +1,10 @@
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, case, cast, or_, tuple_, Numeric
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models.review import Review
 from src.db.models.employee import Employee
+from src.db.enums import BranchEnum
+from src.cache.render_cache import render_cache, branch_scope, employee_scope
+import datetime
 
 
 async def create_review(
@@ -21,7 +24,11 @@ async def create_review(
     )
     session.add(review)
     await session.flush()
+    updated = await apply_review_to_rating(session, employee_id, rating)
     await session.commit()
+    if updated:
+        # After the commit, so nobody can re-cache the old rating under the new version
+        render_cache.bump(employee_scope(employee_id), branch_scope(updated[2]))
     return review
 
 
@@ -31,29 +38,84 @@ async def get_reviews_by_employee(session: AsyncSession, employee_id: int) -> li
     return list(res.scalars().all())
 
 
+async def get_reviews_page(
+    session: AsyncSession,
+    employee_id: int,
+    limit: int = 5,
+    before: tuple[datetime.datetime, int] | None = None,
+    after: tuple[datetime.datetime, int] | None = None,
+) -> tuple[list[Review], bool]:
+    """Newest-first page of reviews older than `before` or newer than `after`, plus whether more remain in that direction.
+
+    Both are (created_at, id) cursors of the last/first review of the neighbouring page.
+    """
+    stmt = select(Review).where(Review.employee_id == employee_id)
+    if after:
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) > tuple_(*after))
+        stmt = stmt.order_by(Review.created_at.asc(), Review.id.asc())
+    else:
+        if before:
+            stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(*before))
+        stmt = stmt.order_by(Review.created_at.desc(), Review.id.desc())
+    res = await session.execute(stmt.limit(limit + 1))
+    reviews = list(res.scalars().all())
+    has_more = len(reviews) > limit
+    reviews = reviews[:limit]
+    if after:
+        reviews.reverse()
+    return reviews, has_more
+
+
 async def get_review_by_order(session: AsyncSession, order_id: int) -> Review | None:
     stmt = select(Review).where(Review.order_id == order_id)
     res = await session.execute(stmt)
     return res.scalar_one_or_none()
 
 
-async def update_employee_rating(session: AsyncSession, employee_id: int) -> Employee | None:
-    employee = await session.get(Employee, employee_id)
-    if not employee:
-        return None
-    
-    stmt = select(func.avg(Review.rating), func.count(Review.id)).where(Review.employee_id == employee_id)
+async def apply_review_to_rating(session: AsyncSession, employee_id: int, rating: int) -> tuple[float, int, BranchEnum] | None:
+    # One atomic UPDATE: concurrent reviews serialize on the row lock instead of overwriting each other
+    stmt = (
+        update(Employee)
+        .where(Employee.id == employee_id)
+        .values(
+            rating_sum=Employee.rating_sum + rating,
+            total_reviews=Employee.total_reviews + 1,
+            rating=func.round(cast(Employee.rating_sum + rating, Numeric) / (Employee.total_reviews + 1), 2),
+        )
+        .returning(Employee.rating, Employee.total_reviews, Employee.branch)
+        .execution_options(synchronize_session=False)
+    )
     res = await session.execute(stmt)
-    avg_rating, total_reviews = res.one()
-    
-    if avg_rating is not None:
-        employee.rating = float(avg_rating)
-        employee.total_reviews = int(total_reviews)
-    else:
-        employee.rating = 0.0
-        employee.total_reviews = 0
-    
-    await session.commit()
-    await session.refresh(employee)
-    return employee
+    row = res.one_or_none()
+    return (float(row.rating), row.total_reviews, row.branch) if row else None
 
+
+async def recompute_employee_ratings(session: AsyncSession) -> int:
+    totals = (
+        select(
+            Employee.id.label("employee_id"),
+            func.coalesce(func.sum(Review.rating), 0).label("rating_sum"),
+            func.count(Review.id).label("total_reviews"),
+        )
+        .select_from(Employee)
+        .outerjoin(Review, Review.employee_id == Employee.id)
+        .group_by(Employee.id)
+        .subquery()
+    )
+    rating = case(
+        (totals.c.total_reviews > 0, func.round(cast(totals.c.rating_sum, Numeric) / totals.c.total_reviews, 2)),
+        else_=0,
+    )
+    stmt = (
+        update(Employee)
+        .where(Employee.id == totals.c.employee_id)
+        .where(or_(
+            Employee.rating_sum != totals.c.rating_sum,
+            Employee.total_reviews != totals.c.total_reviews,
+            Employee.rating != rating,
+        ))
+        .values(rating_sum=totals.c.rating_sum, total_reviews=totals.c.total_reviews, rating=rating)
+        .execution_options(synchronize_session=False)
+    )
+    res = await session.execute(stmt)
+    return res.rowcount
@@ -11,4 +11,10 @@ class OrderStatusEnum(str, enum.Enum):
     PENDING = "PENDING"
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
-    CANCELLED = "CANCELLED"
\ No newline at end of file
+    CANCELLED = "CANCELLED"
+
+class OutboxStatusEnum(str, enum.Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
@@ -0,0 +1,8 @@
+# Import every model so relationship() targets resolve whichever model is used first
+from src.db.models.client import Client
+from src.db.models.employee import Employee
+from src.db.models.order import Order
+from src.db.models.review import Review
+from src.db.models.fsm import FSMRecord
+from src.db.models.outbox import OutboxMessage
+from src.db.models.order_archive import OrderArchive
@@ -1,9 +1,13 @@
-from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import TIMESTAMP, String, Date, Index, text, BigInteger
 from src.db.base import Base
-from typing import Annotated
+from typing import Annotated, TYPE_CHECKING
 import datetime
 
+if TYPE_CHECKING:
+    from src.db.models.order import Order
+    from src.db.models.review import Review
+
 
 idpk = Annotated[int, mapped_column(primary_key=True)]
 created_at = Annotated[datetime.datetime, 
@@ -21,6 +25,9 @@ class Client(Base):
     birth_date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
     created_at: Mapped[created_at]
 
+    orders: Mapped[list["Order"]] = relationship(back_populates="client", passive_deletes=True)
+    reviews: Mapped[list["Review"]] = relationship(back_populates="client", passive_deletes=True)
+
     __table_args__ = (
         Index("idx_clients_telegram_user_id", "telegram_user_id"),
     )
\ No newline at end of file
@@ -1,10 +1,14 @@
-from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import TIMESTAMP, DECIMAL, String, Date, Index, text, BigInteger
+from sqlalchemy.orm import mapped_column, Mapped, relationship
+from sqlalchemy import TIMESTAMP, DECIMAL, String, Date, Index, text, BigInteger, desc, TEXT, Computed
 from src.db.base import Base
 from src.db.enums import BranchEnum
-from typing import Annotated
+from typing import Annotated, TYPE_CHECKING
 import datetime
 
+if TYPE_CHECKING:
+    from src.db.models.order import Order
+    from src.db.models.review import Review
+
 idpk = Annotated[int, mapped_column(primary_key=True)]
 created_at = Annotated[datetime.datetime, 
 mapped_column(TIMESTAMP, nullable=False, server_default=text("TIMEZONE('utc', now())"))]
@@ -22,10 +26,20 @@ class Employee(Base):
     branch: Mapped[BranchEnum] = mapped_column(nullable=False)
     rating: Mapped[float] = mapped_column(DECIMAL(3, 2), default=0.00)
     total_reviews: Mapped[int] = mapped_column(default=0)
+    rating_sum: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    skills: Mapped[str | None] = mapped_column(TEXT, nullable=True)
+    # Lowercased name + skills kept by Postgres itself, searched through the trigram index below
+    search_text: Mapped[str] = mapped_column(
+        TEXT, Computed("lower(first_name || ' ' || last_name || ' ' || coalesce(skills, ''))", persisted=True)
+    )
     created_at: Mapped[created_at]
+
+    orders: Mapped[list["Order"]] = relationship(back_populates="employee", passive_deletes=True)
+    reviews: Mapped[list["Review"]] = relationship(back_populates="employee", passive_deletes=True)
     
     __table_args__ = (
         Index("idx_employee_telegram_user_id", "telegram_user_id"),
-        Index("idx_employee_branch", "branch"),
+        Index("idx_employee_branch_rating_id", "branch", desc("rating"), "id"),
         Index("idx_employee_rating", "rating"),
+        Index("idx_employee_search_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
     )
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import TIMESTAMP, String, text
+from sqlalchemy.dialects.postgresql import JSONB
+from src.db.base import Base
+import datetime
+
+
+class FSMRecord(Base):
+    __tablename__ = "fsm_states"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    state: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP, nullable=False, server_default=text("TIMEZONE('utc', now())")
+    )
@@ -1,32 +1,48 @@
-from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import TIMESTAMP, DECIMAL, Index, text, TEXT, ForeignKey
+from sqlalchemy.orm import mapped_column, Mapped, relationship
+from sqlalchemy import TIMESTAMP, DECIMAL, Index, text, TEXT, ForeignKey, desc
 from src.db.base import Base
-from src.db.enums import OrderStatusEnum
-from typing import Annotated
+from src.db.enums import OrderStatusEnum, BranchEnum
+from typing import TYPE_CHECKING
 import datetime
 
-
-idpk = Annotated[int, mapped_column(primary_key=True)]
-created_at = Annotated[datetime.datetime, 
-mapped_column(TIMESTAMP, nullable=False, server_default=text("TIMEZONE('utc', now())"))]
+if TYPE_CHECKING:
+    from src.db.models.client import Client
+    from src.db.models.employee import Employee
+    from src.db.models.review import Review
 
 
 class Order(Base):
+    """Range-partitioned by month on created_at (see src/db/partitions.py).
+
+    Finished orders past ORDER_ARCHIVE_AFTER_DAYS are moved to orders_archive by src/db/archive.py.
+    """
     __tablename__ = "orders"
     
-    id: Mapped[idpk]
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     client_id: Mapped[int] = mapped_column(ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
-    employee_id: Mapped[int] = mapped_column(ForeignKey("employee.id", ondelete="CASCADE"), nullable=False)
+    # NULL while an open order waits for someone in `branch` to take it
+    employee_id: Mapped[int | None] = mapped_column(ForeignKey("employee.id", ondelete="CASCADE"), nullable=True)
+    branch: Mapped[BranchEnum | None] = mapped_column(nullable=True)
     description: Mapped[str] = mapped_column(TEXT, nullable=False)
     price: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
     status: Mapped[OrderStatusEnum] = mapped_column(nullable=False, default=OrderStatusEnum.PENDING)
-    created_at: Mapped[created_at]
+    # The partition key has to be part of the primary key
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP, primary_key=True, server_default=text("TIMEZONE('utc', now())")
+    )
     finished_at: Mapped[datetime.datetime | None] = mapped_column(TIMESTAMP, nullable=True)
+
+    client: Mapped["Client"] = relationship(back_populates="orders")
+    employee: Mapped["Employee | None"] = relationship(back_populates="orders")
+    review: Mapped["Review | None"] = relationship(
+        back_populates="order", uselist=False, passive_deletes=True, primaryjoin="Order.id == foreign(Review.order_id)"
+    )
     
     
     __table_args__ = (
-        Index("idx_client_id", "client_id"),
-        Index("idx_employee_id", "employee_id"),
+        Index("idx_orders_client_status_created", "client_id", "status", desc("created_at")),
+        Index("idx_orders_employee_status_created", "employee_id", "status", desc("created_at")),
         Index("idx_status", "status"),
-        Index("idx_created_at", "created_at")
-    )
\ No newline at end of file
+        Index("idx_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
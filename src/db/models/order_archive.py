@@ -0,0 +1,28 @@
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import TIMESTAMP, DECIMAL, Index, text, TEXT, ForeignKey
+from src.db.base import Base
+from src.db.enums import OrderStatusEnum, BranchEnum
+import datetime
+
+
+class OrderArchive(Base):
+    """Completed and cancelled orders moved out of `orders`; same columns, ids kept."""
+    __tablename__ = "orders_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    client_id: Mapped[int] = mapped_column(ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
+    employee_id: Mapped[int | None] = mapped_column(ForeignKey("employee.id", ondelete="CASCADE"), nullable=True)
+    branch: Mapped[BranchEnum | None] = mapped_column(nullable=True)
+    description: Mapped[str] = mapped_column(TEXT, nullable=False)
+    price: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
+    status: Mapped[OrderStatusEnum] = mapped_column(nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(TIMESTAMP, nullable=False)
+    finished_at: Mapped[datetime.datetime | None] = mapped_column(TIMESTAMP, nullable=True)
+    archived_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP, nullable=False, server_default=text("TIMEZONE('utc', now())")
+    )
+
+    __table_args__ = (
+        Index("idx_orders_archive_client_created", "client_id", "created_at"),
+        Index("idx_orders_archive_employee_created", "employee_id", "created_at"),
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import TIMESTAMP, String, Index, text, TEXT, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
+from src.db.base import Base
+from src.db.enums import OutboxStatusEnum
+from typing import Annotated
+import datetime
+
+
+idpk = Annotated[int, mapped_column(primary_key=True)]
+created_at = Annotated[datetime.datetime, 
+mapped_column(TIMESTAMP, nullable=False, server_default=text("TIMEZONE('utc', now())"))]
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    id: Mapped[idpk]
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    body: Mapped[str] = mapped_column(TEXT, nullable=False)
+    parse_mode: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    reply_markup: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Set for offers that go stale once the order is taken
+    order_id: Mapped[int | None] = mapped_column(nullable=True)
+    status: Mapped[OutboxStatusEnum] = mapped_column(nullable=False, default=OutboxStatusEnum.PENDING)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP, nullable=False, server_default=text("TIMEZONE('utc', now())")
+    )
+    last_error: Mapped[str | None] = mapped_column(TEXT, nullable=True)
+    created_at: Mapped[created_at]
+    sent_at: Mapped[datetime.datetime | None] = mapped_column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        # Only undelivered rows are ever scanned by the sender
+        Index("idx_outbox_pending_next_attempt", "next_attempt_at", postgresql_where=text("status = 'PENDING'")),
+        Index("idx_outbox_pending_order_id", "order_id", postgresql_where=text("status = 'PENDING' AND order_id IS NOT NULL")),
+    )
@@ -1,9 +1,14 @@
-from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import TIMESTAMP, CheckConstraint, Index, text, TEXT, ForeignKey, SMALLINT
+from sqlalchemy.orm import mapped_column, Mapped, relationship
+from sqlalchemy import TIMESTAMP, CheckConstraint, Index, text, TEXT, ForeignKey, SMALLINT, desc
 from src.db.base import Base
-from typing import Annotated
+from typing import Annotated, TYPE_CHECKING
 import datetime
 
+if TYPE_CHECKING:
+    from src.db.models.client import Client
+    from src.db.models.employee import Employee
+    from src.db.models.order import Order
+
 
 idpk = Annotated[int, mapped_column(primary_key=True)]
 created_at = Annotated[datetime.datetime, 
@@ -16,14 +21,19 @@ class Review(Base):
     id: Mapped[idpk]
     client_id: Mapped[int] = mapped_column(ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
     employee_id: Mapped[int] = mapped_column(ForeignKey("employee.id", ondelete="CASCADE"), nullable=False)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    # No FK: the orders key is (id, created_at) and the order may since have moved to orders_archive
+    order_id: Mapped[int] = mapped_column(nullable=False)
     rating: Mapped[int] = mapped_column(SMALLINT, nullable=False)
     comment: Mapped[str] = mapped_column(TEXT)
     created_at: Mapped[created_at]
+
+    client: Mapped["Client"] = relationship(back_populates="reviews")
+    employee: Mapped["Employee"] = relationship(back_populates="reviews")
+    order: Mapped["Order | None"] = relationship(back_populates="review", primaryjoin="foreign(Review.order_id) == Order.id")
     
     
     __table_args__ = (
-        Index("ix_reviews_employee_id", "employee_id"),
+        Index("ix_reviews_employee_created_id", "employee_id", desc("created_at"), desc("id")),
         Index("ix_reviews_order_id", "order_id"),
         Index("ix_reviews_rating", "rating"),
         CheckConstraint("rating BETWEEN 1 AND 5", name="chk_review_rating")
@@ -0,0 +1,137 @@
+"""Monthly range partitions of `orders` on created_at.
+
+Monthly partitions are named orders_YYYY_MM and cover [first of the month, first of the next).
+orders_legacy, the table from before partitioning (attached by migration 0005), covers
+everything older than the first monthly one, and orders_default catches whatever no
+partition covers, so an insert never fails for want of a partition.
+"""
+from dataclasses import dataclass
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import datetime
+import re
+
+# Partition DDL from two archivers at once would race on the catalog
+PARTITION_LOCK_ID = 7_237_001
+# DDL on a partition takes a lock on `orders` too; fail fast rather than queue every query behind it
+DDL_LOCK_TIMEOUT = "5s"
+
+_BOUNDS = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    # None stands for MINVALUE/MAXVALUE, and for both bounds of the default partition
+    start: datetime.datetime | None
+    end: datetime.datetime | None
+    is_default: bool = False
+
+    def overlaps(self, start: datetime.datetime, end: datetime.datetime) -> bool:
+        if self.is_default:
+            return False
+        return (self.start is None or self.start < end) and (self.end is None or start < self.end)
+
+
+def utc_now() -> datetime.datetime:
+    # created_at columns are naive UTC timestamps
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def month_start(moment: datetime.datetime) -> datetime.datetime:
+    return datetime.datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime.datetime, months: int) -> datetime.datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.datetime) -> str:
+    return f"orders_{month:%Y_%m}"
+
+
+def _parse_bound(value: str) -> datetime.datetime | None:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.datetime.fromisoformat(value.strip("'"))
+
+
+async def list_order_partitions(session: AsyncSession) -> list[Partition]:
+    res = await session.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'orders'::regclass
+    """))
+    partitions = []
+    for name, bound in res.all():
+        if bound == "DEFAULT":
+            partitions.append(Partition(name, None, None, is_default=True))
+            continue
+        start, end = _BOUNDS.search(bound).groups()
+        partitions.append(Partition(name, _parse_bound(start), _parse_bound(end)))
+    return partitions
+
+
+async def _lock_partition_ddl(session: AsyncSession) -> bool:
+    await session.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+    res = await session.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": PARTITION_LOCK_ID})
+    return res.scalar_one()
+
+
+async def ensure_order_partitions(session: AsyncSession, months_ahead: int, now: datetime.datetime | None = None) -> list[str]:
+    """Creates the missing monthly partitions from the current month to `months_ahead` months on.
+
+    Returns their names; an empty list when another process holds the DDL lock. Doesn't commit.
+    """
+    if not await _lock_partition_ddl(session):
+        return []
+
+    partitions = await list_order_partitions(session)
+    current = month_start(now or utc_now())
+    created = []
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        end = add_months(start, 1)
+        if any(partition.overlaps(start, end) for partition in partitions):
+            continue
+        name = partition_name(start)
+        # Fails if orders_default already holds rows of this month; those need moving by hand first
+        await session.execute(text(
+            f"CREATE TABLE {name} PARTITION OF orders FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        ))
+        created.append(name)
+    return created
+
+
+async def find_empty_order_partitions(session: AsyncSession, before: datetime.datetime) -> list[str]:
+    """Partitions that end before `before` and look emptied by the archiver.
+
+    Checked without locks, so they may have filled up since; drop_order_partition_if_empty checks again.
+    """
+    empty = []
+    for partition in await list_order_partitions(session):
+        if partition.is_default or partition.end is None or partition.end > before:
+            continue
+        res = await session.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {partition.name})"))
+        if res.scalar_one():
+            empty.append(partition.name)
+    return empty
+
+
+async def drop_order_partition_if_empty(session: AsyncSession, name: str) -> bool:
+    """Drops one partition found by find_empty_order_partitions, if it is still empty.
+
+    Commit right after: the partition stays locked, and queries on `orders` wait, until then.
+    False when it got rows meanwhile or another process holds the DDL lock.
+    """
+    if not await _lock_partition_ddl(session):
+        return False
+    # Locked before the check, so no row can slip in between it and the DROP
+    await session.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+    res = await session.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {name})"))
+    if not res.scalar_one():
+        return False
+    await session.execute(text(f"DROP TABLE {name}"))
+    return True
@@ -0,0 +1,56 @@
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue
+import time
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedQueue(AsyncAdaptedQueue):
+    # Only the wait for a free slot: connecting, reconnecting and pre-ping happen outside get()
+    def get(self, block: bool = True, timeout: float | None = None):
+        start = time.perf_counter()
+        try:
+            return super().get(block, timeout)
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts waited in the queue for a connection."""
+
+    _queue_class = _TimedQueue
+
+    def connect(self):
+        pool_metrics.checkouts += 1
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": self.overflow(),
+            "checkouts": pool_metrics.checkouts,
+            "timeouts": pool_metrics.timeouts,
+            "wait_seconds_total": pool_metrics.wait_seconds_total,
+            "wait_seconds_max": pool_metrics.wait_seconds_max,
+        }
@@ -0,0 +1,84 @@
+"""Records the SQL statements issued inside a block, for query-budget assertions in tests.
+
+    async def test_view_client_order_budget(db):
+        with assert_max_queries(1) as recorder:
+            await view_client_order(callback)
+        assert not recorder.repeated()
+
+A recorder is a recording QueryStats, so only statements issued from the recording task
+(and tasks it starts) are counted and concurrent traffic on the same engine doesn't leak in.
+See tests/test_query_budgets.py.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.db.query_stats import QueryStats, RecordedQuery, activate_query_stats, current_query_stats, install_query_stats
+from src.db.session import engine as default_engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    """Context manager collecting every statement executed on `engine` by the current context.
+
+    Recorders nest, with each other and with the per-update stats: an outer one also sees
+    the statements of an inner one.
+    """
+
+    def __init__(self, engine: AsyncEngine = default_engine):
+        self.engine = engine
+        self.stats = QueryStats(record=True)
+        self._token = None
+
+    def __enter__(self) -> "QueryRecorder":
+        install_query_stats(self.engine)
+        self._token = activate_query_stats(self.stats)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        current_query_stats.reset(self._token)
+
+    @property
+    def queries(self) -> list[RecordedQuery]:
+        return self.stats.queries
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    @property
+    def statements(self) -> list[str]:
+        return [query.statement for query in self.queries]
+
+    def repeated(self, threshold: int = 2) -> list[tuple[str, int]]:
+        """Statements run at least `threshold` times with any parameters: usually an N+1 or a missing batch."""
+        counts = Counter(self.statements)
+        return [(statement, count) for statement, count in counts.most_common() if count >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{len(self.queries)} statements, {sum(query.seconds for query in self.queries) * 1000:.1f} ms"]
+        for index, query in enumerate(self.queries, 1):
+            lines.append(f"  {index}. {' '.join(query.statement.split())}")
+        repeated = self.repeated()
+        if repeated:
+            lines.append("Repeated statements:")
+            lines += [f"  x{count}: {' '.join(statement.split())}" for statement, count in repeated]
+        return "\n".join(lines)
+
+    def assert_max(self, budget: int) -> None:
+        if len(self.queries) > budget:
+            raise QueryBudgetExceeded(f"Expected at most {budget} statements, got {self.report()}")
+
+    def assert_no_repeats(self) -> None:
+        if self.repeated():
+            raise QueryBudgetExceeded(f"Repeated statements found, {self.report()}")
+
+
+@contextmanager
+def assert_max_queries(budget: int, engine: AsyncEngine = default_engine) -> Iterator[QueryRecorder]:
+    with QueryRecorder(engine) as recorder:
+        yield recorder
+    recorder.assert_max(budget)
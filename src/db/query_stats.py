@@ -0,0 +1,68 @@
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+import time
+
+
+@dataclass
+class RecordedQuery:
+    statement: str
+    parameters: Any
+    seconds: float
+
+
+class QueryStats:
+    """SQL statements and time spent in the database while this object is the current one.
+
+    With `record=True` it also keeps every statement. Stats made current while another one
+    is (an update's inside a test's) add to the outer one as well.
+    """
+
+    __slots__ = ("count", "seconds", "queries", "parent")
+
+    def __init__(self, record: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.queries: list[RecordedQuery] | None = [] if record else None
+        self.parent: QueryStats | None = None
+
+    def add(self, statement: str, parameters: Any, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            if stats.queries is not None:
+                stats.queries.append(RecordedQuery(statement, parameters, seconds))
+            stats = stats.parent
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def activate_query_stats(stats: QueryStats) -> Token:
+    """Makes `stats` the current one, nested in whatever was current; undo with current_query_stats.reset()."""
+    stats.parent = current_query_stats.get()
+    return current_query_stats.set(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the execution context, which is discarded with the statement even when it raises
+    if context is not None and current_query_stats.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current_query_stats.get()
+    start = getattr(context, "_query_start", None)
+    if stats is not None and start is not None:
+        stats.add(statement, parameters, time.perf_counter() - start)
+
+
+def install_query_stats(engine: AsyncEngine) -> None:
+    # Cursor events fire on the sync engine underneath; SQLAlchemy's greenlets carry our contextvar into them
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,15 @@
+from src.db.session import engine, Local_Session
+from src.db.crud.review import recompute_employee_ratings
+import asyncio
+
+
+async def recompute_ratings():
+    async with Local_Session() as session:
+        updated = await recompute_employee_ratings(session)
+        await session.commit()
+    await engine.dispose()
+    print(f"Ratings recomputed, {updated} employees fixed")
+
+
+if __name__ == "__main__":
+    asyncio.run(recompute_ratings())
@@ -1,10 +1,43 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from uuid import uuid4
 from src.db.config import settings
+from src.db.pool_metrics import InstrumentedQueuePool
+from src.db.query_stats import install_query_stats
 
-engine = create_async_engine(url=settings.DATABASE_URL, echo=True,)
+
+def connect_args() -> dict:
+    if settings.DB_PGBOUNCER:
+        # Each transaction may land on another server connection, where a statement prepared
+        # earlier doesn't exist and asyncpg's numbered names may already be taken
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+
+engine = create_async_engine(
+    url=settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=connect_args(),
+)
+install_query_stats(engine)
 
 Local_Session = async_sessionmaker(
     autocommit=False,
     autoflush=False,
+    # Handlers keep using loaded rows (and their relationships) after commit without lazy IO
+    expire_on_commit=False,
     bind=engine,
-)
\ No newline at end of file
+)
+
+
+def pool_stats() -> dict[str, int | float]:
+    return engine.pool.stats()
@@ -0,0 +1,80 @@
+import asyncio
+import inspect
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+# Settings are read at import time; tests that need a real database get it from TEST_DATABASE_URL
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    url = make_url(TEST_DATABASE_URL)
+    os.environ.update(
+        DB_NAME=url.database,
+        DB_USER=url.username,
+        DB_PASS=url.password or "",
+        DB_HOST=url.host,
+        DB_PORT=str(url.port or 5432),
+    )
+
+for name, value in {
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASS": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "BOT_TOKEN": "123456:ABCdefGHIjklMNOpqrSTUvwxYZ012345678",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+TABLES = "clients, employee, orders, orders_archive, reviews, outbox, fsm_states"
+
+
+async def _clear_tables() -> None:
+    from src.db.session import engine
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {TABLES} RESTART IDENTITY CASCADE"))
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def migrated_db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    command.upgrade(Config("alembic.ini"), "head")
+
+
+@pytest.fixture
+def db(migrated_db):
+    """An empty, fully migrated database behind src.db.session for the test."""
+    from src.cache.role_cache import role_cache
+    from src.cache.render_cache import render_cache
+
+    asyncio.run(_clear_tables())
+    role_cache.clear()
+    render_cache.clear()
+
+
+async def _run(pyfuncitem, kwargs) -> None:
+    try:
+        await pyfuncitem.obj(**kwargs)
+    finally:
+        if "db" in pyfuncitem.fixturenames:
+            from src.db.session import engine
+
+            # Pooled asyncpg connections belong to this test's event loop
+            await engine.dispose()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # Runs `async def` tests on a fresh event loop each, without a plugin
+    if inspect.iscoroutinefunction(pyfuncitem.obj):
+        kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+        asyncio.run(_run(pyfuncitem, kwargs))
+        return True
@@ -0,0 +1,55 @@
+import datetime
+
+from sqlalchemy import func, select
+
+from src.db import archive
+from src.db.archive import OrderArchiver
+from src.db.crud.client import create_client
+from src.db.crud.employee import create_employee
+from src.db.crud.order import create_order
+from src.db.enums import BranchEnum, OrderStatusEnum
+from src.db.models.order import Order
+from src.db.models.order_archive import OrderArchive
+from src.db.session import Local_Session
+
+BIRTH_DATE = datetime.date(1990, 1, 1)
+
+
+async def seed_old_orders(finished: int, open_: int) -> None:
+    year_ago = datetime.datetime.utcnow() - datetime.timedelta(days=365)
+    async with Local_Session() as session:
+        client = await create_client(session, 1001, "Ann", "Lee", "+100", BIRTH_DATE)
+        employee = await create_employee(session, 2001, "Bob", "Ray", "+200", BIRTH_DATE, BranchEnum.IT)
+        for i in range(finished + open_):
+            order = await create_order(session, client.id, employee.id, f"Task {i}", 10)
+            order.created_at = year_ago
+            if i < finished:
+                order.status = OrderStatusEnum.COMPLETED
+        await session.commit()
+
+
+async def count(model) -> int:
+    async with Local_Session() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def test_archiver_moves_old_finished_orders_in_batches(db):
+    await seed_old_orders(finished=5, open_=2)
+
+    moved = await OrderArchiver(Local_Session, batch_size=2, batch_pause=0).run_once()
+
+    assert moved == 5
+    assert (await count(Order), await count(OrderArchive)) == (2, 5)
+
+
+async def test_archiver_steps_fail_independently(db, monkeypatch):
+    await seed_old_orders(finished=3, open_=0)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(archive, "ensure_order_partitions", broken)
+    monkeypatch.setattr(archive, "find_empty_order_partitions", broken)
+
+    assert await OrderArchiver(Local_Session, batch_pause=0).run_once() == 3
+    assert await count(OrderArchive) == 3
@@ -0,0 +1,51 @@
+import sys
+
+from aiogram.fsm.storage.base import StorageKey
+
+from src.bot.fsm.bounded_memory_storage import BoundedMemoryStorage
+
+
+def key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+def walked_bytes(storage: BoundedMemoryStorage) -> int:
+    size = sys.getsizeof(storage._records)
+    for k, record in storage._records.items():
+        size += sys.getsizeof(k) + sys.getsizeof(record)
+        if record.state:
+            size += sys.getsizeof(record.state)
+        if record.data:
+            size += sys.getsizeof(record.data)
+            size += sum(sys.getsizeof(a) + sys.getsizeof(b) for a, b in record.data.items())
+    return size
+
+
+async def test_stats_counters_follow_writes_and_evictions():
+    storage = BoundedMemoryStorage(max_entries=3)
+    empty = storage.stats()["bytes"]
+
+    for user_id in range(5):
+        await storage.set_state(key(user_id), "Form:name")
+        await storage.set_data(key(user_id), {"name": "Ann" * user_id, "age": user_id})
+    await storage.set_data(key(4), {"name": "Bob"})
+    await storage.set_state(key(3), None)
+    await storage.set_data(key(3), {})
+
+    stats = storage.stats()
+    assert stats["entries"] == 2
+    assert stats["evicted"] == 2
+    assert stats["bytes"] == walked_bytes(storage)
+
+    await storage.close()
+    assert storage.stats()["bytes"] == empty
+
+
+async def test_stats_counters_drop_expired_records():
+    storage = BoundedMemoryStorage(ttl=0)
+    await storage.set_data(key(1), {"name": "Ann"})
+
+    stats = storage.stats()
+    assert stats["entries"] == 0
+    assert stats["expired"] == 1
+    assert stats["bytes"] == walked_bytes(storage)
@@ -0,0 +1,57 @@
+import csv
+import datetime
+import json
+
+from src.db.bulk import export_table, import_table
+from src.db.crud.client import create_client
+from src.db.crud.employee import create_employee
+from src.db.crud.order import archive_finished_orders, create_order
+from src.db.enums import BranchEnum, OrderStatusEnum
+from src.db.session import Local_Session
+
+BIRTH_DATE = datetime.date(1990, 1, 1)
+
+
+async def seed_orders(count: int, archived: int) -> None:
+    async with Local_Session() as session:
+        client = await create_client(session, 1001, "Ann", "Lee", "+100", BIRTH_DATE)
+        employee = await create_employee(session, 2001, "Bob", "Ray", "+200", BIRTH_DATE, BranchEnum.IT)
+        orders = [await create_order(session, client.id, employee.id, f"Task {i}", 10) for i in range(count)]
+        for order in orders[:archived]:
+            order.status = OrderStatusEnum.COMPLETED
+        await session.commit()
+        moved = await archive_finished_orders(session, datetime.datetime(9999, 1, 1), limit=count)
+        await session.commit()
+    assert moved == archived
+
+
+async def test_orders_export_includes_archived_orders(db, tmp_path):
+    await seed_orders(5, archived=2)
+
+    await export_table("orders", tmp_path / "orders.csv", batch_size=2)
+    with (tmp_path / "orders.csv").open(newline="") as file:
+        assert [int(row["id"]) for row in csv.DictReader(file)] == [1, 2, 3, 4, 5]
+
+    await export_table("orders", tmp_path / "orders.jsonl", batch_size=2)
+    with (tmp_path / "orders.jsonl").open() as file:
+        rows = [json.loads(line) for line in file]
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert [row["status"] for row in rows[:2]] == ["COMPLETED", "COMPLETED"]
+
+
+async def test_orders_import_rejects_rows_without_employee_or_branch(db, tmp_path):
+    async with Local_Session() as session:
+        client = await create_client(session, 1001, "Ann", "Lee", "+100", BIRTH_DATE)
+        await session.commit()
+    path = tmp_path / "orders.jsonl"
+    rows = [
+        {"client_id": client.id, "branch": "IT", "description": "Open", "price": "10", "status": "PENDING"},
+        {"client_id": client.id, "description": "Nobody's", "price": "10", "status": "PENDING"},
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    await import_table("orders", path, batch_size=10)
+
+    with (tmp_path / "orders.jsonl.rejects.jsonl").open() as file:
+        rejects = [json.loads(line) for line in file]
+    assert [(reject["line"], reject["error"]) for reject in rejects] == [(2, "either employee_id or branch is required")]
@@ -0,0 +1,170 @@
+from types import SimpleNamespace
+
+from aiogram import Bot, Dispatcher, Router, F
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import Update
+from sqlalchemy import Delete, Insert, Select
+from sqlalchemy.dialects import postgresql
+
+from src.bot.fsm.postgres_storage import PostgresStorage
+from src.bot.middlewares.fsm_batch import FSMBatchMiddleware
+
+BOT_ID = 123456
+KEY = StorageKey(bot_id=BOT_ID, chat_id=42, user_id=42)
+
+
+class Form(StatesGroup):
+    name = State()
+    age = State()
+
+
+class FakeFSMTable:
+    """fsm_states in a dict, counting the statements the storage sends to it."""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self.reads = 0
+        self.writes = 0
+
+    def session(self) -> "FakeSession":
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, table: FakeFSMTable):
+        self.table = table
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def execute(self, stmt):
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        if isinstance(stmt, Select):
+            self.table.reads += 1
+            row = self.table.rows.get(params["key_1"])
+            return SimpleNamespace(one_or_none=lambda: SimpleNamespace(**row) if row else None)
+
+        self.table.writes += 1
+        if isinstance(stmt, Insert):
+            row = self.table.rows.setdefault(params["key"], {"state": None, "data": {}})
+            row.update({column: params[column] for column in ("state", "data") if column in params})
+        elif isinstance(stmt, Delete):
+            self.table.rows.pop(params["key_1"], None)
+        else:
+            raise AssertionError(f"Unexpected statement {stmt}")
+
+
+async def test_round_trip_without_batch():
+    table = FakeFSMTable()
+    storage = PostgresStorage(table.session)
+
+    await storage.set_state(KEY, Form.name)
+    await storage.set_data(KEY, {"name": "Ann"})
+
+    assert await storage.get_state(KEY) == Form.name.state
+    assert await storage.get_data(KEY) == {"name": "Ann"}
+    assert await storage.get_data(StorageKey(bot_id=BOT_ID, chat_id=1, user_id=1)) == {}
+    assert table.writes == 2
+
+
+async def test_batch_coalesces_writes():
+    table = FakeFSMTable()
+    storage = PostgresStorage(table.session)
+    table.rows[storage._make_key(KEY)] = {"state": Form.name.state, "data": {"name": "Ann"}}
+
+    async with storage.batch():
+        await storage.update_data(KEY, {"age": 30})
+        await storage.update_data(KEY, {"city": "Baku"})
+        await storage.set_data(KEY, {**await storage.get_data(KEY), "phone": "+994"})
+        await storage.set_state(KEY, Form.age)
+        assert await storage.get_state(KEY) == Form.age.state
+        assert table.writes == 0
+
+    assert table.reads == 1
+    assert table.writes == 1
+    assert table.rows[storage._make_key(KEY)] == {
+        "state": Form.age.state,
+        "data": {"name": "Ann", "age": 30, "city": "Baku", "phone": "+994"},
+    }
+
+
+async def test_batch_without_changes_writes_nothing():
+    table = FakeFSMTable()
+    storage = PostgresStorage(table.session)
+
+    async with storage.batch():
+        assert await storage.get_state(KEY) is None
+        assert await storage.get_data(KEY) == {}
+
+    assert table.reads == 1
+    assert table.writes == 0
+
+
+async def test_cleared_context_is_deleted():
+    table = FakeFSMTable()
+    storage = PostgresStorage(table.session)
+    table.rows[storage._make_key(KEY)] = {"state": Form.age.state, "data": {"name": "Ann"}}
+
+    async with storage.batch():
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+
+    assert table.writes == 1
+    assert storage._make_key(KEY) not in table.rows
+
+
+def message_update(update_id: int, text: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": KEY.chat_id, "type": "private"},
+            "from": {"id": KEY.user_id, "is_bot": False, "first_name": "Ann"},
+            "text": text,
+        },
+    })
+
+
+async def test_middleware_writes_once_per_update():
+    table = FakeFSMTable()
+    storage = PostgresStorage(table.session)
+    router = Router()
+
+    @router.message(F.text == "start")
+    async def start(message, state: FSMContext):
+        await state.set_state(Form.name)
+        await state.update_data(step=1)
+        await state.update_data(started=True)
+
+    @router.message(Form.name)
+    async def name(message, state: FSMContext):
+        await state.update_data(name=message.text)
+        await state.update_data(step=2)
+        await state.set_state(Form.age)
+
+    dp = Dispatcher(storage=storage)
+    dp.update.outer_middleware(FSMBatchMiddleware(storage))
+    dp.include_router(router)
+    bot = Bot(token="123456:ABCdefGHIjklMNOpqrSTUvwxYZ012345678")
+
+    try:
+        await dp.feed_update(bot, message_update(1, "start"))
+        assert table.writes == 1
+        await dp.feed_update(bot, message_update(2, "Ann"))
+        assert table.writes == 2
+    finally:
+        await bot.session.close()
+
+    assert table.rows[storage._make_key(KEY)] == {
+        "state": Form.age.state,
+        "data": {"step": 2, "started": True, "name": "Ann"},
+    }
@@ -0,0 +1,105 @@
+"""Statement budgets for the hot read paths; a failure prints every statement that ran.
+
+Needs TEST_DATABASE_URL (skipped otherwise): the database is migrated to head and emptied per test.
+"""
+import datetime
+
+from aiogram.types import Update
+
+from benchmarks.fake_telegram import fake_bot_factory
+from benchmarks.updates import callback_update, message_update
+from src.bot.handlres.user.clients.client_handlers import view_client_order
+from src.bot.handlres.user.employee.employee_handlers import show_employee_statistics
+from src.db.crud.client import create_client
+from src.db.crud.employee import create_employee, get_employees_paginated
+from src.db.crud.order import create_order, get_employee_order_stats, get_order_with_details, get_orders_page
+from src.db.crud.review import create_review, get_reviews_page
+from src.db.enums import BranchEnum, OrderStatusEnum
+from src.db.query_recorder import QueryRecorder, assert_max_queries
+from src.db.session import Local_Session
+
+CLIENT_USER_ID = 1001
+EMPLOYEE_USER_ID = 2001
+BIRTH_DATE = datetime.date(1990, 1, 1)
+
+
+async def seed(orders: int = 5):
+    """A client and a freelancer with `orders` orders between them; the first one completed and reviewed."""
+    async with Local_Session() as session:
+        client = await create_client(session, CLIENT_USER_ID, "Ann", "Lee", "+100", BIRTH_DATE)
+        employee = await create_employee(session, EMPLOYEE_USER_ID, "Bob", "Ray", "+200", BIRTH_DATE, BranchEnum.IT)
+        created = [await create_order(session, client.id, employee.id, f"Task {i}", 10 + i) for i in range(orders)]
+        created[0].status = OrderStatusEnum.COMPLETED
+        await session.commit()
+        await create_review(session, client.id, employee.id, created[0].id, 5, "Great")
+    return client, employee, created
+
+
+async def test_order_reads_take_one_statement_each(db):
+    client, employee, orders = await seed()
+    statuses = tuple(OrderStatusEnum)
+
+    async with Local_Session() as session:
+        with QueryRecorder() as recorder:
+            page, has_more = await get_orders_page(session, statuses, client_id=client.id, limit=3)
+            assert len(recorder) == 1, recorder.report()
+            assert (len(page), has_more) == (3, True)
+
+            stats = await get_employee_order_stats(session, employee.id)
+            assert len(recorder) == 2, recorder.report()
+            assert stats.total == len(orders)
+
+            order = await get_order_with_details(session, orders[0].id)
+            # Loaded with the order, so touching them costs nothing
+            assert (order.client.id, order.employee.id, order.review.rating) == (client.id, employee.id, 5)
+            assert len(recorder) == 3, recorder.report()
+    recorder.assert_no_repeats()
+
+
+async def test_listing_reads_take_one_statement_each(db):
+    _, employee, _ = await seed()
+
+    async with Local_Session() as session:
+        with assert_max_queries(1):
+            employees, _ = await get_employees_paginated(session, BranchEnum.IT)
+        assert [e.id for e in employees] == [employee.id]
+
+        with assert_max_queries(1):
+            reviews, has_more = await get_reviews_page(session, employee.id)
+        assert (len(reviews), has_more) == (1, False)
+
+
+async def test_show_employee_statistics_budget(db):
+    _, employee, orders = await seed()
+    bot = fake_bot_factory()
+    message = Update.model_validate(message_update(EMPLOYEE_USER_ID, "📊 Statistics"), context={"bot": bot}).message
+
+    with assert_max_queries(1):
+        reply = await show_employee_statistics(message, employee)
+    assert f"<b>Total orders:</b> {len(orders)}" in reply.text
+
+
+async def test_view_client_order_budget(db):
+    _, _, orders = await seed()
+    bot = fake_bot_factory()
+    callback = Update.model_validate(
+        callback_update(CLIENT_USER_ID, f"client_order_view:{orders[1].id}"), context={"bot": bot}
+    ).callback_query
+
+    with assert_max_queries(1):
+        await view_client_order(callback)
+    assert bot.session.calls["EditMessageText"] == 1
+
+
+async def test_recorders_nest_and_see_only_their_block(db):
+    client, _, _ = await seed()
+
+    async with Local_Session() as session:
+        with QueryRecorder() as outer:
+            await get_orders_page(session, (OrderStatusEnum.PENDING,), client_id=client.id)
+            with QueryRecorder() as inner:
+                await get_orders_page(session, (OrderStatusEnum.PENDING,), client_id=client.id)
+        await get_orders_page(session, (OrderStatusEnum.PENDING,), client_id=client.id)
+
+    assert (len(outer), len(inner)) == (2, 1)
+    assert outer.repeated() == [(inner.statements[0], 2)]
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import GetUpdates
+from aiogram.types import Update
+from aiogram.utils.backoff import BackoffConfig
+
+from src.bot import sharding
+from src.bot.sharding import ShardedWorkers, run_sharded_polling
+
+
+def raw_update(update_id: int, user_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Ann"},
+            "text": "hi",
+        },
+    }
+
+
+class FakePool:
+    def __init__(self, workers: int):
+        self.submitted: list[dict] = []
+        self.stopped = False
+
+    def start(self) -> None:
+        pass
+
+    async def asubmit(self, raw: dict) -> None:
+        self.submitted.append(raw)
+
+    def stop(self) -> None:
+        self.stopped = True
+
+
+class FlakyBot:
+    """getUpdates that fails the way the Bot API does now and then."""
+
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.offsets: list[int | None] = []
+        self.drop_pending_updates = None
+
+    async def delete_webhook(self, drop_pending_updates: bool) -> None:
+        self.drop_pending_updates = drop_pending_updates
+
+    async def get_updates(self, offset, timeout, allowed_updates):
+        self.offsets.append(offset)
+        response = self.responses.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        return [Update.model_validate(raw) for raw in response]
+
+
+async def test_polling_survives_get_updates_errors(monkeypatch):
+    pools = []
+    monkeypatch.setattr(sharding, "ShardedWorkers", lambda workers: pools.append(FakePool(workers)) or pools[-1])
+    monkeypatch.setattr(sharding, "POLLING_BACKOFF", BackoffConfig(min_delay=0.01, max_delay=0.02, factor=1.3, jitter=0.0))
+    method = GetUpdates()
+    bot = FlakyBot([
+        [raw_update(1, 10)],
+        TelegramNetworkError(method, "connection reset"),
+        TelegramRetryAfter(method, "Too Many Requests", retry_after=0),
+        [raw_update(2, 11), raw_update(3, 10)],
+        asyncio.CancelledError(),
+    ])
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_sharded_polling(bot, ["message"], workers=2)
+
+    pool = pools[0]
+    assert [raw["update_id"] for raw in pool.submitted] == [1, 2, 3]
+    assert bot.offsets == [None, 2, 2, 2, 4]
+    assert bot.drop_pending_updates is False
+    assert pool.stopped
+
+
+async def test_full_worker_queue_holds_up_submit():
+    pool = ShardedWorkers(1, queue_size=1)
+    await pool.asubmit(raw_update(1, 10))
+    second = asyncio.create_task(pool.asubmit(raw_update(2, 10)))
+    await asyncio.sleep(0.1)
+    assert not second.done()
+
+    assert (await asyncio.to_thread(pool.queues[0].get, timeout=1))["update_id"] == 1
+    await asyncio.wait_for(second, 1)
+    assert (await asyncio.to_thread(pool.queues[0].get, timeout=1))["update_id"] == 2
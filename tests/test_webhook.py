@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router, F
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot.config import bot_settings
+from src.bot.webhook import ReplyingRequestHandler, webhook_secret
+
+SECRET = "s3cret"
+
+
+def message_update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 42, "type": "private"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Ann"},
+            "text": text,
+        },
+    }
+
+
+def form_fields(body: bytes) -> dict[str, str]:
+    # The reply is multipart/form-data: one part per field of the Telegram method
+    fields = {}
+    for part in body.split(b"--webhookBoundary")[1:]:
+        head, _, value = part.partition(b"\r\n\r\n")
+        if b'name="' in head:
+            name = head.split(b'name="', 1)[1].split(b'"', 1)[0].decode()
+            fields[name] = value.rsplit(b"\r\n", 1)[0].decode()
+    return fields
+
+
+async def post_update(reply_timeout: float, update: dict, secret: str = SECRET):
+    router = Router()
+    finished = asyncio.Event()
+
+    @router.message(F.text == "ping")
+    async def ping(message: Message):
+        return message.answer("pong")
+
+    @router.message(F.text == "slow")
+    async def slow(message: Message):
+        await asyncio.sleep(0.2)
+        finished.set()
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot(token="123456:ABCdefGHIjklMNOpqrSTUvwxYZ012345678")
+    app = web.Application()
+    ReplyingRequestHandler(dp, bot, reply_timeout=reply_timeout, secret_token=SECRET).register(app, path="/webhook")
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post(
+            "/webhook", json=update, headers={"X-Telegram-Bot-Api-Secret-Token": secret}
+        )
+        body = await response.read()
+        status = response.status
+        slow_done_before_reply = finished.is_set()
+        if update["message"]["text"] == "slow":
+            await asyncio.wait_for(finished.wait(), 1)
+    await bot.session.close()
+    return status, body, slow_done_before_reply
+
+
+async def test_fast_handler_result_is_the_webhook_reply():
+    status, body, _ = await post_update(1.0, message_update(1, "ping"))
+
+    assert status == 200
+    fields = form_fields(body)
+    assert fields["method"] == "sendMessage"
+    assert fields["chat_id"] == "42"
+    assert fields["text"] == "pong"
+
+
+async def test_slow_handler_gets_empty_reply_and_finishes_in_background():
+    status, body, done_before_reply = await post_update(0.05, message_update(2, "slow"))
+
+    assert status == 200
+    assert form_fields(body) == {}
+    assert not done_before_reply
+
+
+async def test_unhandled_update_gets_empty_reply():
+    status, body, _ = await post_update(1.0, message_update(3, "hello"))
+
+    assert status == 200
+    assert form_fields(body) == {}
+
+
+async def test_wrong_secret_is_rejected():
+    status, _, _ = await post_update(1.0, message_update(4, "ping"), secret="wrong")
+
+    assert status == 401
+
+
+def test_webhook_mode_requires_a_secret(monkeypatch):
+    monkeypatch.setattr(bot_settings, "WEBHOOK_SECRET", "")
+    with pytest.raises(RuntimeError):
+        webhook_secret()